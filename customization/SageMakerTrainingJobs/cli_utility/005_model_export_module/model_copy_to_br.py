@@ -11,12 +11,17 @@ import boto3
 import time
 import argparse
 import sys
-from datetime import datetime
 
 def clear_line():
     """Clear current line for status updates"""
     print('\r' + ' ' * 80 + '\r', end='', flush=True)
 
+def format_elapsed(seconds):
+    """Format an elapsed duration in seconds as H:MM:SS"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
 def create_provisioned_throughput(bedrock_client, model_arn, provisioned_units):
     """
     Create provisioned throughput for a Bedrock model
@@ -49,7 +54,7 @@ def monitor_provisioned_model(bedrock_client, provisioned_model_arn, check_inter
         check_interval (int): Time in seconds between status checks
     """
     print(f"\n🔄 Monitoring provisioned model setup...")
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     while True:
         try:
@@ -58,8 +63,7 @@ def monitor_provisioned_model(bedrock_client, provisioned_model_arn, check_inter
             )
             status = response['status']
             
-            elapsed_time = datetime.now() - start_time
-            elapsed_str = str(elapsed_time).split('.')[0]
+            elapsed_str = format_elapsed(time.perf_counter() - start_time)
             
             clear_line()
             print(f"📊 Provisioned Model Status: {status} | Elapsed: {elapsed_str}", end='', flush=True)
@@ -120,7 +124,7 @@ def monitor_model_status(model_name, s3_uri, role_arn, provisioned_units=None, r
         bedrock_client.create_custom_model(**request_params)
         
         model_found = False
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         model_arn = None
         
         while True:
@@ -143,8 +147,7 @@ def monitor_model_status(model_name, s3_uri, role_arn, provisioned_units=None, r
                     print(f"⏳ Model '{model_name}' not found yet... Waiting for creation to start", end='', flush=True)
                 else:
                     current_status = target_model['modelStatus']
-                    elapsed_time = datetime.now() - start_time
-                    elapsed_str = str(elapsed_time).split('.')[0]
+                    elapsed_str = format_elapsed(time.perf_counter() - start_time)
                     
                     clear_line()
                     print(f"📊 Status: {current_status} | Elapsed: {elapsed_str}", end='', flush=True)
@@ -13,17 +13,52 @@ Usage:
 """
 
 import argparse
+import asyncio
 import boto3
+import contextlib
+import functools
+import itertools
 import json
 import logging
 import os
+import queue
 import sys
+import threading
 import time
 import random
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# aiobotocore is optional: it enables the async inference path, which holds many
+# concurrent converse requests on one event loop instead of one thread each.
+try:
+    from aiobotocore.session import get_session as _get_aio_session
+except ImportError:
+    _get_aio_session = None
+
+# orjson is optional: its C implementation parses and serializes JSON several
+# times faster than the stdlib and emits UTF-8 bytes directly.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(data) -> Any:
+    """Parse a JSON document (str or bytes) with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json_bytes(obj: Any) -> bytes:
+    """Serialize an object to UTF-8 JSON bytes with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
 
 # Configure logging
 logging.basicConfig(
@@ -100,8 +135,17 @@ Examples:
     # Processing options
     infer_parser.add_argument('--max-workers', type=int, default=5, help='Maximum number of worker threads (default: 5)')
     infer_parser.add_argument('--retries', type=int, default=MAX_RETRIES, help=f'Maximum number of retries (default: {MAX_RETRIES})')
+    infer_parser.add_argument('--base-backoff', type=float, default=INITIAL_BACKOFF,
+                              help=f'Base backoff in seconds for retries (default: {INITIAL_BACKOFF})')
+    infer_parser.add_argument('--max-backoff', type=float, default=MAX_BACKOFF,
+                              help=f'Backoff cap in seconds for retries (default: {MAX_BACKOFF})')
     infer_parser.add_argument('--batch-size', type=int, default=20, help='Number of entries to process before saving results (default: 20)')
     infer_parser.add_argument('--start-index', type=int, default=0, help='Start processing from this index (default: 0)')
+    infer_parser.add_argument('--sync', action='store_true',
+                              help='Use the synchronous ThreadPoolExecutor path instead of asyncio + aiobotocore')
+    infer_parser.add_argument('--shard',
+                              help="Process only byte-range shard i of n, given as 'i/n' (0-based). "
+                                   "Output goes to <output>.shard<i>; merge shards with cat")
     
     # Inference parameters
     infer_parser.add_argument('--max-tokens', type=int, default=2048, help='Maximum tokens for generation (default: 2048)')
@@ -111,6 +155,27 @@ Examples:
     # Debug options
     infer_parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     
+    # Batch inference command (provider-managed batching via Bedrock batch jobs)
+    batch_parser = subparsers.add_parser(
+        'batch-infer',
+        help='Run inference as a Bedrock batch inference job instead of per-entry converse calls'
+    )
+    batch_parser.add_argument('--input', '-i', required=True, help='Input JSONL file path')
+    batch_parser.add_argument('--output', '-o', required=True, help='Output JSONL file path')
+    batch_model_group = batch_parser.add_mutually_exclusive_group(required=True)
+    batch_model_group.add_argument('--model-arn', help='ARN for provisioned throughput model')
+    batch_model_group.add_argument('--model-id', choices=list(MODEL_IDS.keys()) + ["custom"],
+                                   help='Model ID (nova-micro, nova-lite, nova-pro, nova-premier, or custom)')
+    batch_parser.add_argument('--custom-model-id', help='Custom model ID when --model-id=custom is specified')
+    batch_parser.add_argument('--region', default='us-east-1', help='AWS region (default: us-east-1)')
+    batch_parser.add_argument('--profile', help='AWS profile name to use')
+    batch_parser.add_argument('--s3-bucket', required=True, help='S3 bucket for batch job input/output')
+    batch_parser.add_argument('--s3-prefix', default='nova-batch-inference',
+                              help='S3 key prefix for batch job input/output (default: nova-batch-inference)')
+    batch_parser.add_argument('--role-arn', required=True,
+                              help='IAM role ARN that Bedrock assumes to read/write the S3 data')
+    batch_parser.add_argument('--job-name', help='Batch job name (default: derived from input file name)')
+
     # Validate command
     validate_parser = subparsers.add_parser('validate', help='Validate a JSONL file')
     validate_parser.add_argument('--input', '-i', required=True, help='Input JSONL file path')
@@ -121,149 +186,298 @@ Examples:
     return parser.parse_args()
 
 
-def setup_boto3_client(region: str, profile: Optional[str] = None) -> boto3.client:
-    """Set up the boto3 client with the appropriate credentials."""
+def setup_boto3_client(region: str, profile: Optional[str] = None, max_workers: int = 5) -> boto3.client:
+    """
+    Set up the boto3 client with the appropriate credentials.
+
+    The connection pool is sized above the worker count so concurrent threads
+    never queue inside botocore, TCP keep-alive keeps TLS sessions warm across
+    requests, and botocore's internal retries are disabled because call_nova
+    implements its own backoff (stacking both multiplies retry storms).
+    """
+    config = Config(
+        max_pool_connections=max(max_workers * 2, 50),
+        retries={"mode": "standard", "max_attempts": 1},
+        tcp_keepalive=True,
+        connect_timeout=5,
+        read_timeout=120
+    )
     try:
         if profile:
             session = boto3.Session(profile_name=profile)
-            client = session.client("bedrock-runtime", region_name=region)
+            client = session.client("bedrock-runtime", region_name=region, config=config)
         else:
-            client = boto3.client("bedrock-runtime", region_name=region)
+            client = boto3.client("bedrock-runtime", region_name=region, config=config)
         return client
     except Exception as e:
         logger.error(f"Failed to set up boto3 client: {str(e)}")
         raise
 
 
-def read_jsonl(file_path: str) -> List[Dict[str, Any]]:
-    """Read data from a JSONL file."""
-    data = []
+def iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield entries from a JSONL file.
+
+    Streaming one line at a time keeps memory at O(batch_size) regardless of
+    input length and lets the first API call fire before the whole file has
+    been parsed.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
+        with open(file_path, 'rb') as file:
             for i, line in enumerate(file):
                 try:
                     if line.strip():
-                        entry = json.loads(line)
-                        data.append(entry)
-                except json.JSONDecodeError as e:
+                        yield loads_json(line)
+                except ValueError as e:
                     logger.warning(f"Skipping invalid JSON at line {i+1}: {str(e)}")
-        logger.info(f"Loaded {len(data)} entries from {file_path}")
-        return data
-    except Exception as e:
+    except OSError as e:
         logger.error(f"Error reading file {file_path}: {str(e)}")
         raise
 
 
-def save_to_jsonl(data: List[Dict[str, Any]], output_file: str, mode: str = 'w') -> None:
-    """Save data to a JSONL file, either in write mode or append mode."""
-    try:
-        with open(output_file, mode, encoding='utf-8') as file:
-            for item in data:
-                file.write(json.dumps(item, ensure_ascii=False) + '\n')
-        logger.info(f"Saved {len(data)} entries to {output_file} in {mode} mode")
-    except Exception as e:
-        logger.error(f"Error saving to {output_file}: {str(e)}")
-        # Save to a backup file in case the main file is inaccessible
-        backup_file = f"{output_file}.backup.{int(time.time())}.jsonl"
-        with open(backup_file, 'w', encoding='utf-8') as file:
-            for item in data:
-                file.write(json.dumps(item, ensure_ascii=False) + '\n')
-        logger.info(f"Saved backup to {backup_file}")
-
-
-def exponential_backoff(retry_number: int, jitter: bool = True) -> float:
-    """Calculate the exponential backoff time with optional jitter."""
-    backoff = min(MAX_BACKOFF, INITIAL_BACKOFF * (2 ** retry_number))
+def iter_jsonl_shard(file_path: str, shard_index: int, shard_count: int) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield entries from one byte-range shard of a JSONL file.
+
+    JSONL splits cleanly on byte offsets: shard i owns every line that starts
+    in [size*i//n, size*(i+1)//n). Each process seeks to its start offset,
+    skips the partial line left over from the previous shard, and stops once
+    it crosses its end offset, so multiple processes can divide one file with
+    no locks or coordination.
+    """
+    file_size = os.stat(file_path).st_size
+    start = file_size * shard_index // shard_count
+    end = file_size * (shard_index + 1) // shard_count
+
+    with open(file_path, 'rb') as file:
+        if start > 0:
+            # Step back one byte: if it is a newline, this shard starts on a
+            # line boundary and owns that line; otherwise discard the tail of
+            # the line owned by the previous shard
+            file.seek(start - 1)
+            if file.read(1) != b'\n':
+                file.readline()
+
+        line_num = 0
+        while True:
+            line_start = file.tell()
+            if line_start >= end:
+                break
+            line = file.readline()
+            if not line:
+                break
+            line_num += 1
+            try:
+                if line.strip():
+                    yield loads_json(line)
+            except ValueError as e:
+                logger.warning(f"Skipping invalid JSON in shard {shard_index} (line {line_num}): {str(e)}")
+
+
+def serialize_batch(data: List[Dict[str, Any]]) -> bytes:
+    """Serialize a batch of entries into one newline-delimited JSON buffer."""
+    return b'\n'.join(dumps_json_bytes(item) for item in data) + b'\n'
+
+
+def writer_main(write_queue: queue.Queue) -> None:
+    """
+    Drain (file object, serialized batch) tuples and issue the writes, so the
+    batch loop overlaps disk I/O with the next batch's network I/O. A None
+    item shuts the writer down.
+    """
+    while True:
+        item = write_queue.get()
+        if item is None:
+            return
+        file_obj, blob = item
+        try:
+            file_obj.write(blob)
+        # ValueError covers a write that races a closing handle during
+        # shutdown; the batch still lands in the backup file below
+        except (OSError, ValueError) as e:
+            name = getattr(file_obj, 'name', 'output')
+            logger.error(f"Error writing to {name}: {str(e)}")
+            # Keep a backup so a full or failing disk doesn't lose the batch
+            backup_file = f"{name}.backup.{int(time.time())}.jsonl"
+            try:
+                with open(backup_file, 'wb') as backup:
+                    backup.write(blob)
+                logger.info(f"Saved backup to {backup_file}")
+            except OSError:
+                logger.error(f"Backup write to {backup_file} also failed; batch lost")
+
+
+def exponential_backoff(retry_number: int, jitter: bool = True,
+                        base: float = INITIAL_BACKOFF, cap: float = MAX_BACKOFF) -> float:
+    """
+    Calculate the exponential backoff time with optional full jitter.
+
+    Full jitter (sleep uniformly in [0, min(cap, base * 2**n)]) spreads
+    retries across the whole window instead of clustering them around the
+    power-of-two point, which avoids synchronized retry storms under
+    throttling.
+    """
+    backoff = min(cap, base * (2 ** retry_number))
     if jitter:
-        backoff = backoff * (0.5 + random.random())
+        backoff = random.uniform(0, backoff)
     return backoff
 
 
+def prepare_entry(entry: Dict[str, Any]) -> Tuple[Optional[List[Dict[str, str]]], List[Dict[str, Any]]]:
+    """Extract the system prompt and messages from a JSONL entry."""
+    system_prompt = None
+    if "system" in entry and entry["system"]:
+        # Handle system prompt if present
+        if isinstance(entry["system"], list) and len(entry["system"]) > 0:
+            system_content = entry["system"][0].get("text", "") if entry["system"] else ""
+            system_prompt = [{"text": system_content}]
+        elif isinstance(entry["system"], str):
+            system_prompt = [{"text": entry["system"]}]
+
+    messages = entry.get("messages", [])
+    return system_prompt, messages
+
+
+def build_result(entry: Dict[str, Any], model_response: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the model response (and extracted text) to a copy of the entry."""
+    result = entry.copy()
+    result["model_response"] = model_response
+
+    # Extract and add the text response for convenience
+    try:
+        response_text = model_response["output"]["message"]["content"][0]["text"]
+        result["response_text"] = response_text
+    except (KeyError, IndexError) as e:
+        logger.warning(f"Could not extract response text: {str(e)}")
+        result["response_text"] = None
+
+    return result
+
+
+# Shared throttle gate: when Bedrock reports throttling, every worker backs
+# off until the advertised recovery time instead of independently re-hitting
+# the quota.
+_throttle_lock = threading.Lock()
+_throttle_until = 0.0
+
+
+def note_throttle(wait_time: float) -> None:
+    """Record that the service asked us to back off for wait_time seconds."""
+    global _throttle_until
+    with _throttle_lock:
+        _throttle_until = max(_throttle_until, time.monotonic() + wait_time)
+
+
+def throttle_delay() -> float:
+    """Seconds left until the shared throttle gate reopens (0 when clear)."""
+    with _throttle_lock:
+        return max(0.0, _throttle_until - time.monotonic())
+
+
+def server_retry_hint(error_response: Dict[str, Any]) -> Optional[float]:
+    """Pull the server's Retry-After hint (in seconds) from a ClientError response."""
+    headers = error_response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    for header in ('retry-after', 'x-amzn-retry-after'):
+        value = headers.get(header)
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
+# Serialize cache fills so a burst of workers triggers at most one
+# GetInferenceProfile control-plane call (the API has a low TPS cap)
+_resolve_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=16)
+def _get_profile_model_arn(arn: str, region: str, profile: Optional[str]) -> str:
+    session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+    bedrock = session.client("bedrock", region_name=region)
+    response = bedrock.get_inference_profile(inferenceProfileIdentifier=arn)
+    models = response.get("models", [])
+    if models and "modelArn" in models[0]:
+        return models[0]["modelArn"]
+    return arn
+
+
+def resolve_inference_profile(arn: str, region: str, profile: Optional[str] = None) -> str:
+    """
+    Resolve an inference-profile ARN to its underlying model ARN once per
+    process, so converse calls skip Bedrock's per-request profile lookup.
+    Falls back to the original ARN if the lookup fails.
+    """
+    with _resolve_lock:
+        try:
+            return _get_profile_model_arn(arn, region, profile)
+        except Exception as e:
+            logger.warning(f"Could not resolve inference profile {arn}: {str(e)}")
+            return arn
+
+
+def build_converse_kwargs(model_identifier: str, max_tokens: int, temperature: float, top_p: float) -> Dict[str, Any]:
+    """Build the converse arguments shared by every entry in a run."""
+    return {
+        "modelId": model_identifier,
+        "inferenceConfig": {
+            "maxTokens": max_tokens,
+            "topP": top_p,
+            "temperature": temperature
+        }
+    }
+
+
 def call_nova(
     client: boto3.client,
     entry: Dict[str, Any],
-    model_identifier: str,
+    base_kwargs: Dict[str, Any],
     max_retries: int,
-    max_tokens: int,
-    temperature: float,
-    top_p: float
+    base_backoff: float = INITIAL_BACKOFF,
+    max_backoff: float = MAX_BACKOFF
 ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
     """
     Call the Nova model with retry logic, returning both the original entry and the response.
     If the call fails after max_retries, returns the entry and None for the response.
-    
+
     Args:
         client: boto3 client for bedrock-runtime
         entry: The input entry containing messages
-        model_identifier: The model ID or ARN to use
+        base_kwargs: Pre-built converse arguments (model ID and inference config)
         max_retries: Maximum number of retry attempts
-        max_tokens: Maximum tokens to generate
-        temperature: Temperature parameter for generation
-        top_p: Top P parameter for generation
-        
+        base_backoff: Base backoff in seconds for retries
+        max_backoff: Backoff cap in seconds for retries
+
     Returns:
         Tuple of (original entry, model response or None if failed)
     """
-    # Extract the system prompt and messages from the entry
-    system_prompt = None
-    if "system" in entry and entry["system"]:
-        # Handle system prompt if present
-        if isinstance(entry["system"], list) and len(entry["system"]) > 0:
-            system_content = entry["system"][0].get("text", "") if entry["system"] else ""
-            system_prompt = [{"text": system_content}]
-        elif isinstance(entry["system"], str):
-            system_prompt = [{"text": entry["system"]}]
-    
-    # Process messages
-    messages = entry.get("messages", [])
+    system_prompt, messages = prepare_entry(entry)
     if not messages:
         logger.warning("No messages found in entry")
         return entry, None
-    
-    # Set up inference parameters
-    inference_params = {
-        "maxTokens": max_tokens,
-        "topP": top_p,
-        "temperature": temperature
-    }
-    
-    # Prepare payload for API call
-    payload = []
-    payload.extend(messages)
-    
+
+    # Merge the full request once so retries reuse the same dict instead of
+    # rebuilding the kwargs on every attempt
+    request_kwargs = dict(base_kwargs, messages=messages)
+    if system_prompt:
+        request_kwargs["system"] = system_prompt
+
     # Initialize retry counter
     retry_count = 0
-    
+
     while retry_count <= max_retries:
         try:
+            # Respect the shared throttle gate before issuing the call
+            delay = throttle_delay()
+            if delay:
+                time.sleep(delay)
+
             # Make the API call to Nova model
-            if system_prompt:
-                model_response = client.converse(
-                    modelId=model_identifier,
-                    messages=payload,
-                    system=system_prompt,
-                    inferenceConfig=inference_params
-                )
-            else:
-                model_response = client.converse(
-                    modelId=model_identifier,
-                    messages=payload,
-                    inferenceConfig=inference_params
-                )
+            model_response = client.converse(**request_kwargs)
             
             # Add the response to the original entry
-            result = entry.copy()
-            result["model_response"] = model_response
-            
-            # Extract and add the text response for convenience
-            try:
-                response_text = model_response["output"]["message"]["content"][0]["text"]
-                result["response_text"] = response_text
-            except (KeyError, IndexError) as e:
-                logger.warning(f"Could not extract response text: {str(e)}")
-                result["response_text"] = None
-            
-            return entry, result
+            return entry, build_result(entry, model_response)
         
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -275,7 +489,13 @@ def call_nova(
                 
                 retry_count += 1
                 if retry_count <= max_retries:
-                    backoff_time = exponential_backoff(retry_count - 1)
+                    backoff_time = exponential_backoff(retry_count - 1, base=base_backoff, cap=max_backoff)
+                    # Prefer the server's own recovery hint when it is longer
+                    retry_after = server_retry_hint(e.response)
+                    if retry_after is not None:
+                        backoff_time = max(retry_after, backoff_time)
+                    if error_code == 'ThrottlingException':
+                        note_throttle(backoff_time)
                     logger.warning(
                         f"Retriable error ({error_code}): {error_msg}. "
                         f"Retry {retry_count}/{max_retries} in {backoff_time:.2f}s"
@@ -299,7 +519,7 @@ def call_nova(
             
             retry_count += 1
             if retry_count <= max_retries:
-                backoff_time = exponential_backoff(retry_count - 1)
+                backoff_time = exponential_backoff(retry_count - 1, base=base_backoff, cap=max_backoff)
                 logger.warning(
                     f"Unexpected error. Retry {retry_count}/{max_retries} in {backoff_time:.2f}s"
                 )
@@ -321,26 +541,182 @@ def process_batch(
     max_tokens: int,
     temperature: float,
     top_p: float,
-    max_workers: int
+    max_workers: int,
+    base_backoff: float = INITIAL_BACKOFF,
+    max_backoff: float = MAX_BACKOFF,
+    executor: Optional[ThreadPoolExecutor] = None
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    """Process a batch of entries in parallel."""
+    """
+    Process a batch of entries in parallel.
+
+    When the caller supplies a long-lived executor it is reused across
+    batches, avoiding per-batch thread creation and teardown; otherwise a
+    temporary pool is created for this batch only.
+    """
     results = []
     failures = []
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+    # Built once per batch: every entry shares the same model ID and config
+    base_kwargs = build_converse_kwargs(model_identifier, max_tokens, temperature, top_p)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
         future_to_entry = {
             executor.submit(
-                call_nova, client, entry, model_identifier, max_retries, max_tokens, temperature, top_p
+                call_nova, client, entry, base_kwargs, max_retries, base_backoff, max_backoff
             ): entry for entry in batch
         }
-        
+
         for future in as_completed(future_to_entry):
             entry, result = future.result()
             if result:
                 results.append(result)
             else:
                 failures.append(entry)
-    
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return results, failures
+
+
+async def call_nova_async(
+    client: Any,
+    semaphore: asyncio.Semaphore,
+    entry: Dict[str, Any],
+    base_kwargs: Dict[str, Any],
+    max_retries: int,
+    base_backoff: float = INITIAL_BACKOFF,
+    max_backoff: float = MAX_BACKOFF
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Async variant of call_nova driven by aiobotocore.
+
+    The semaphore bounds the number of in-flight converse requests so one event
+    loop can replace the thread pool without overwhelming the Bedrock endpoint.
+    """
+    system_prompt, messages = prepare_entry(entry)
+    if not messages:
+        logger.warning("No messages found in entry")
+        return entry, None
+
+    # Merge the full request once so retries reuse the same dict instead of
+    # rebuilding the kwargs on every attempt
+    request_kwargs = dict(base_kwargs, messages=messages)
+    if system_prompt:
+        request_kwargs["system"] = system_prompt
+
+    # Initialize retry counter
+    retry_count = 0
+
+    async with semaphore:
+        while retry_count <= max_retries:
+            try:
+                # Respect the shared throttle gate before issuing the call
+                delay = throttle_delay()
+                if delay:
+                    await asyncio.sleep(delay)
+
+                # Make the API call to Nova model
+                model_response = await client.converse(**request_kwargs)
+
+                return entry, build_result(entry, model_response)
+
+            except ClientError as e:
+                error_code = e.response['Error']['Code']
+                error_msg = e.response['Error']['Message']
+
+                # Check if this is a retriable error
+                if error_code in ['ThrottlingException', 'ServiceUnavailableException',
+                                  'InternalServerException', 'RequestTimeout']:
+
+                    retry_count += 1
+                    if retry_count <= max_retries:
+                        backoff_time = exponential_backoff(retry_count - 1, base=base_backoff, cap=max_backoff)
+                        # Prefer the server's own recovery hint when it is longer
+                        retry_after = server_retry_hint(e.response)
+                        if retry_after is not None:
+                            backoff_time = max(retry_after, backoff_time)
+                        if error_code == 'ThrottlingException':
+                            note_throttle(backoff_time)
+                        logger.warning(
+                            f"Retriable error ({error_code}): {error_msg}. "
+                            f"Retry {retry_count}/{max_retries} in {backoff_time:.2f}s"
+                        )
+                        await asyncio.sleep(backoff_time)
+                        continue
+                    else:
+                        logger.error(
+                            f"Max retries reached. Last error ({error_code}): {error_msg}"
+                        )
+                else:
+                    # Non-retriable error
+                    logger.error(f"Non-retriable error ({error_code}): {error_msg}")
+
+                # Return the original entry and None to indicate failure
+                return entry, None
+
+            except Exception as e:
+                # Handle unexpected exceptions
+                logger.error(f"Unexpected error: {str(e)}")
+
+                retry_count += 1
+                if retry_count <= max_retries:
+                    backoff_time = exponential_backoff(retry_count - 1, base=base_backoff, cap=max_backoff)
+                    logger.warning(
+                        f"Unexpected error. Retry {retry_count}/{max_retries} in {backoff_time:.2f}s"
+                    )
+                    await asyncio.sleep(backoff_time)
+                    continue
+
+                # Return the original entry and None to indicate failure
+                return entry, None
+
+    # This should never be reached, but just in case
+    return entry, None
+
+
+async def process_batch_async(
+    batch: List[Dict[str, Any]],
+    model_identifier: str,
+    max_retries: int,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
+    max_workers: int,
+    region: str,
+    profile: Optional[str] = None,
+    base_backoff: float = INITIAL_BACKOFF,
+    max_backoff: float = MAX_BACKOFF
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Process a batch of entries concurrently on a single event loop."""
+    results = []
+    failures = []
+
+    session = _get_aio_session()
+    if profile:
+        session.set_config_variable("profile", profile)
+
+    semaphore = asyncio.Semaphore(max_workers)
+
+    # Built once per batch: every entry shares the same model ID and config
+    base_kwargs = build_converse_kwargs(model_identifier, max_tokens, temperature, top_p)
+
+    async with session.create_client("bedrock-runtime", region_name=region) as client:
+        outcomes = await asyncio.gather(*(
+            call_nova_async(
+                client, semaphore, entry, base_kwargs, max_retries, base_backoff, max_backoff
+            ) for entry in batch
+        ))
+
+    for entry, result in outcomes:
+        if result:
+            results.append(result)
+        else:
+            failures.append(entry)
+
     return results, failures
 
 
@@ -365,56 +741,73 @@ def validate_jsonl(file_path: str) -> bool:
             print(f"Error: File must have .jsonl extension: {file_path}")
             return False
         
-        # Validate each line
-        with open(file_path, 'r', encoding='utf-8') as f:
-            valid_entries = 0
-            invalid_entries = 0
-            
+        # Validate each line; issues are collected and emitted in one pass so
+        # a noisy file doesn't pay a locked, flushing print per bad line
+        issues = []
+        valid_entries = 0
+        invalid_entries = 0
+
+        # Binary mode: lines stay as bytes for the cheap pre-screen below and
+        # the JSON decoder accepts them directly
+        with open(file_path, 'rb') as f:
             for line_num, line in enumerate(f, 1):
+                stripped = line.strip()
+
+                # Cheap screen: a conforming line must contain the messages
+                # key, so its absence is reported without a full decode
+                if stripped and b'"messages"' not in stripped:
+                    issues.append(f"Warning on line {line_num}: Missing 'messages' field")
+                    invalid_entries += 1
+                    continue
+
                 try:
-                    data = json.loads(line.strip())
-                    
+                    data = loads_json(stripped)
+
                     # Check for messages field
                     if "messages" not in data:
-                        print(f"Warning on line {line_num}: Missing 'messages' field")
+                        issues.append(f"Warning on line {line_num}: Missing 'messages' field")
                         invalid_entries += 1
                         continue
-                    
+
                     # Check that messages is a list
                     if not isinstance(data["messages"], list):
-                        print(f"Warning on line {line_num}: 'messages' field must be a list")
+                        issues.append(f"Warning on line {line_num}: 'messages' field must be a list")
                         invalid_entries += 1
                         continue
-                    
+
                     # Check that there's at least one message
                     if len(data["messages"]) == 0:
-                        print(f"Warning on line {line_num}: 'messages' list is empty")
+                        issues.append(f"Warning on line {line_num}: 'messages' list is empty")
                         invalid_entries += 1
                         continue
-                    
+
                     # Check system field if present
                     if "system" in data:
                         if isinstance(data["system"], list):
                             # Check that system is a list of objects with text field
                             for i, system_msg in enumerate(data["system"]):
                                 if not isinstance(system_msg, dict) or "text" not in system_msg:
-                                    print(f"Warning on line {line_num}: 'system[{i}]' must have a 'text' field")
+                                    issues.append(f"Warning on line {line_num}: 'system[{i}]' must have a 'text' field")
                                     invalid_entries += 1
                                     break
                         elif not isinstance(data["system"], str):
-                            print(f"Warning on line {line_num}: 'system' must be a list or string")
+                            issues.append(f"Warning on line {line_num}: 'system' must be a list or string")
                             invalid_entries += 1
                             continue
-                    
+
                     valid_entries += 1
-                    
-                except json.JSONDecodeError:
-                    print(f"Error on line {line_num}: Invalid JSON")
+
+                except ValueError:
+                    issues.append(f"Error on line {line_num}: Invalid JSON")
                     invalid_entries += 1
                 except Exception as e:
-                    print(f"Error on line {line_num}: {e}")
+                    issues.append(f"Error on line {line_num}: {e}")
                     invalid_entries += 1
-        
+
+        # Emit all collected issues at once
+        if issues:
+            print('\n'.join(issues))
+
         # Print validation summary
         print(f"\nValidation Summary for {file_path}:")
         print(f"  Valid entries: {valid_entries}")
@@ -434,16 +827,8 @@ def validate_jsonl(file_path: str) -> bool:
         return False
 
 
-def cmd_infer(args):
-    """Run inference on a JSONL file."""
-    # Set log level based on debug flag
-    if args.debug:
-        logger.setLevel(logging.DEBUG)
-        # Set boto3 logging to INFO for more details on requests
-        boto3_logger = logging.getLogger('botocore')
-        boto3_logger.setLevel(logging.INFO)
-    
-    # Determine model identifier (ARN or ID)
+def resolve_model_identifier(args) -> str:
+    """Determine the model identifier (ARN or ID) from the parsed arguments."""
     if args.model_arn:
         model_identifier = args.model_arn
         logger.info(f"Using provisioned throughput ARN: {model_identifier}")
@@ -456,78 +841,232 @@ def cmd_infer(args):
         else:
             model_identifier = MODEL_IDS[args.model_id]
         logger.info(f"Using model ID: {model_identifier}")
-    
+    return model_identifier
+
+
+def cmd_batch_infer(args):
+    """
+    Run inference as a Bedrock batch inference job.
+
+    Uploads the input JSONL to S3 as-is, starts a model invocation job, polls
+    until it reaches a terminal state, then downloads the generated
+    *.jsonl.out records into the local output file. Provider-managed batching
+    amortizes model loading across the whole file and removes client-side
+    concurrency tuning and throttling retries entirely.
+    """
+    model_identifier = resolve_model_identifier(args)
+
+    if args.profile:
+        session = boto3.Session(profile_name=args.profile)
+    else:
+        session = boto3.Session()
+    s3 = session.client("s3", region_name=args.region)
+    bedrock = session.client("bedrock", region_name=args.region)
+
+    job_name = args.job_name or f"nova-batch-{os.path.splitext(os.path.basename(args.input))[0]}-{int(time.time())}"
+    input_key = f"{args.s3_prefix}/{job_name}/input/{os.path.basename(args.input)}"
+    output_prefix = f"{args.s3_prefix}/{job_name}/output/"
+
+    # Upload the input JSONL unchanged; batch jobs consume the same record schema
+    logger.info(f"Uploading {args.input} to s3://{args.s3_bucket}/{input_key}")
+    s3.upload_file(args.input, args.s3_bucket, input_key)
+
+    # Start the batch job
+    response = bedrock.create_model_invocation_job(
+        jobName=job_name,
+        modelId=model_identifier,
+        roleArn=args.role_arn,
+        inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{args.s3_bucket}/{input_key}"}},
+        outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"s3://{args.s3_bucket}/{output_prefix}"}}
+    )
+    job_arn = response["jobArn"]
+    logger.info(f"Started batch inference job: {job_arn}")
+
+    # Poll with exponential backoff until the job reaches a terminal state
+    poll_count = 0
+    while True:
+        job = bedrock.get_model_invocation_job(jobIdentifier=job_arn)
+        status = job["status"]
+        if status in ("Completed", "Failed", "Stopped", "PartiallyCompleted", "Expired"):
+            break
+        wait_time = exponential_backoff(min(poll_count, 5))
+        logger.info(f"Job status: {status}. Checking again in {wait_time:.1f}s")
+        time.sleep(wait_time)
+        poll_count += 1
+
+    if status not in ("Completed", "PartiallyCompleted"):
+        logger.error(f"Batch job ended with status {status}: {job.get('message', 'no details')}")
+        sys.exit(1)
+    logger.info(f"Batch job finished with status: {status}")
+
+    # Download and merge the *.jsonl.out results into the local output file
+    n_records = 0
+    paginator = s3.get_paginator("list_objects_v2")
+    with open(args.output, 'w', encoding='utf-8') as out_f:
+        for page in paginator.paginate(Bucket=args.s3_bucket, Prefix=output_prefix):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith(".jsonl.out"):
+                    continue
+                body = s3.get_object(Bucket=args.s3_bucket, Key=obj["Key"])["Body"]
+                for line in body.iter_lines():
+                    if line:
+                        out_f.write(line.decode('utf-8') + '\n')
+                        n_records += 1
+
+    logger.info(f"Merged {n_records} result records into {args.output}")
+    print(f"\nBatch inference complete: {n_records} records written to {args.output}")
+
+
+def cmd_infer(args):
+    """Run inference on a JSONL file."""
+    # Set log level based on debug flag
+    if args.debug:
+        logger.setLevel(logging.DEBUG)
+        # Set boto3 logging to INFO for more details on requests
+        boto3_logger = logging.getLogger('botocore')
+        boto3_logger.setLevel(logging.INFO)
+
+    model_identifier = resolve_model_identifier(args)
+
+    # Resolve inference-profile ARNs client-side, once per process
+    if ":inference-profile/" in model_identifier:
+        model_identifier = resolve_inference_profile(model_identifier, args.region, args.profile)
+        logger.info(f"Resolved inference profile to: {model_identifier}")
+
     logger.info(f"Starting inference with arguments: {args}")
     
-    # Set up the boto3 client
-    client = setup_boto3_client(args.region, args.profile)
-    
-    # Load data from input file
-    data = read_jsonl(args.input)
-    
+    # Prefer the async path: one event loop holds all in-flight converse calls
+    # instead of one blocking thread per request.
+    use_async = not args.sync and _get_aio_session is not None
+    if not args.sync and _get_aio_session is None:
+        logger.warning("aiobotocore is not installed; falling back to the synchronous thread pool path")
+
+    # Set up the boto3 client (only needed for the synchronous path)
+    client = None
+    if not use_async:
+        client = setup_boto3_client(args.region, args.profile, args.max_workers)
+
+    # Stream entries from the input file instead of materializing the whole
+    # list; with --shard this process only reads its own byte range
+    output_path = args.output
+    if args.shard:
+        try:
+            shard_index, shard_count = (int(part) for part in args.shard.split('/'))
+        except ValueError:
+            logger.error(f"Invalid --shard value '{args.shard}': expected 'i/n', e.g. 0/4")
+            sys.exit(1)
+        if not 0 <= shard_index < shard_count:
+            logger.error(f"Invalid --shard value '{args.shard}': index must be in [0, {shard_count})")
+            sys.exit(1)
+        entries = iter_jsonl_shard(args.input, shard_index, shard_count)
+        output_path = f"{args.output}.shard{shard_index}"
+        logger.info(f"Processing shard {shard_index}/{shard_count}, writing to {output_path}")
+    else:
+        entries = iter_jsonl(args.input)
+
     # Start from the specified index
     if args.start_index > 0:
-        if args.start_index >= len(data):
-            logger.error(f"Start index {args.start_index} is out of range (total entries: {len(data)})")
-            sys.exit(1)
-        logger.info(f"Starting from index {args.start_index} out of {len(data)} entries")
-        data = data[args.start_index:]
-    
+        logger.info(f"Skipping the first {args.start_index} entries")
+        entries = itertools.islice(entries, args.start_index, None)
+
     # Create output file directory if it doesn't exist
-    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
-    
-    # Check if output file exists (for append mode after batch processing)
-    output_file_exists = os.path.exists(args.output)
-    
-    # Process data in batches
-    total_entries = len(data)
-    all_results = []
-    all_failures = []
-    
-    for i in range(0, len(data), args.batch_size):
-        batch = data[i:i + args.batch_size]
-        logger.info(f"Processing batch {i//args.batch_size + 1}/{(total_entries-1)//args.batch_size + 1} ({len(batch)} entries)")
-        
-        results, failures = process_batch(
-            client, batch, model_identifier, args.retries, args.max_tokens, args.temperature, args.top_p, args.max_workers
-        )
-        
-        # Save batch results immediately to avoid losing progress
-        if results:
-            mode = 'a' if output_file_exists or all_results else 'w'
-            save_to_jsonl(results, args.output, mode)
-            output_file_exists = True
-        
-        # Save failures for retry or analysis
-        if failures:
-            failure_file = f"{args.output}.failures.jsonl"
-            mode = 'a' if os.path.exists(failure_file) or all_failures else 'w'
-            save_to_jsonl(failures, failure_file, mode)
-            logger.warning(f"Saved {len(failures)} failed entries to {failure_file}")
-        
-        # Keep track of results and failures for summary
-        all_results.extend(results)
-        all_failures.extend(failures)
-        
-        logger.info(f"Completed batch {i//args.batch_size + 1}: {len(results)} successful, {len(failures)} failed")
-    
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    # Process data in batches; only counters are kept across batches, since
+    # every result is already on disk once its batch is written
+    n_ok = 0
+    n_fail = 0
+    seq = args.start_index
+    batch_num = 0
+    failure_file = f"{output_path}.failures.jsonl"
+
+    # Keep the output handles open across batches: append mode creates the
+    # files when missing and avoids the per-batch open/stat/close round-trip
+    # (and the racy os.path.exists check that used to pick the mode)
+    with contextlib.ExitStack() as stack:
+        out_f = stack.enter_context(open(output_path, 'ab'))
+        fail_f = None
+        # The failure file is opened lazily below, so its close must be
+        # registered here — before the writer callbacks — to run after the
+        # queue has drained; otherwise a still-queued failure batch would
+        # hit a closed handle on unwind
+        stack.callback(lambda: fail_f.close() if fail_f else None)
+
+        # Serialization stays in the main thread (cheap); the write() syscalls
+        # run on a dedicated writer so the loop can launch the next batch
+        write_queue = queue.Queue(maxsize=4)
+        writer = threading.Thread(target=writer_main, args=(write_queue,), daemon=True)
+        writer.start()
+        stack.callback(writer.join)
+        stack.callback(write_queue.put, None)
+
+        # One pool for the whole run: threads are created once, not per batch
+        executor = None
+        if not use_async:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=args.max_workers))
+
+        while True:
+            batch = list(itertools.islice(entries, args.batch_size))
+            if not batch:
+                break
+            batch_num += 1
+            logger.info(f"Processing batch {batch_num} ({len(batch)} entries)")
+
+            # Tag each entry with its input position so downstream tooling can
+            # re-sort the completion-ordered output
+            for entry in batch:
+                entry["seq"] = seq
+                seq += 1
+
+            if use_async:
+                results, failures = asyncio.run(process_batch_async(
+                    batch, model_identifier, args.retries, args.max_tokens, args.temperature, args.top_p,
+                    args.max_workers, args.region, args.profile, args.base_backoff, args.max_backoff
+                ))
+            else:
+                results, failures = process_batch(
+                    client, batch, model_identifier, args.retries, args.max_tokens, args.temperature, args.top_p,
+                    args.max_workers, args.base_backoff, args.max_backoff, executor=executor
+                )
+
+            # Save batch results immediately to avoid losing progress
+            if results:
+                write_queue.put((out_f, serialize_batch(results)))
+
+            # Save failures for retry or analysis
+            if failures:
+                if fail_f is None:
+                    # Closed by the callback registered before the writer
+                    # callbacks, i.e. only after the writer has drained
+                    fail_f = open(failure_file, 'ab')
+                write_queue.put((fail_f, serialize_batch(failures)))
+                logger.warning(f"Saved {len(failures)} failed entries to {failure_file}")
+
+            # Keep track of counts for the summary
+            n_ok += len(results)
+            n_fail += len(failures)
+
+            logger.info(f"Completed batch {batch_num}: {len(results)} successful, {len(failures)} failed")
+
     # Log summary
     logger.info("=" * 50)
-    logger.info(f"Processing complete: {len(all_results)} successful, {len(all_failures)} failed")
-    logger.info(f"Results saved to: {args.output}")
-    if all_failures:
-        logger.info(f"Failures saved to: {args.output}.failures.jsonl")
+    logger.info(f"Processing complete: {n_ok} successful, {n_fail} failed")
+    logger.info(f"Results saved to: {output_path}")
+    if n_fail:
+        logger.info(f"Failures saved to: {failure_file}")
     logger.info("=" * 50)
-    
+
     # Print summary to console
+    total = n_ok + n_fail
     print("\nInference Summary:")
-    print(f"  Total entries processed: {len(all_results) + len(all_failures)}")
-    print(f"  Successful: {len(all_results)}")
-    print(f"  Failed: {len(all_failures)}")
-    print(f"  Success rate: {len(all_results)/(len(all_results) + len(all_failures))*100:.1f}%")
-    print(f"\nResults saved to: {args.output}")
-    if all_failures:
-        print(f"Failures saved to: {args.output}.failures.jsonl")
+    print(f"  Total entries processed: {total}")
+    print(f"  Successful: {n_ok}")
+    print(f"  Failed: {n_fail}")
+    if total:
+        print(f"  Success rate: {n_ok/total*100:.1f}%")
+    print(f"\nResults saved to: {output_path}")
+    if n_fail:
+        print(f"Failures saved to: {failure_file}")
 
 
 def cmd_validate(args):
@@ -556,6 +1095,8 @@ def main():
     
     if args.command == 'infer':
         cmd_infer(args)
+    elif args.command == 'batch-infer':
+        cmd_batch_infer(args)
     elif args.command == 'validate':
         cmd_validate(args)
     elif args.command == 'version':
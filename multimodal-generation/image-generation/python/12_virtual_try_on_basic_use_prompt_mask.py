@@ -3,7 +3,6 @@ from random import randint
 from amazon_image_gen import BedrockImageGenerator
 import file_utils
 import logging
-import base64
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
@@ -15,12 +14,9 @@ def main():
     source_image_path = "../images/vto-images/vto_prompt_mask_source.jpg"
     reference_image_path = "../images/vto-images/vto_prompt_mask_reference.jpg"
 
-    # Load the source image from disk.
-    with open(source_image_path, "rb") as image_file:
-        source_image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
-    # Load the reference image from disk.
-    with open(reference_image_path, "rb") as image_file:
-        reference_image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
+    # Load the images from disk (cached, so repeat runs skip re-encoding).
+    source_image_base64 = file_utils.load_image_as_base64(source_image_path)
+    reference_image_base64 = file_utils.load_image_as_base64(reference_image_path)
 
     # Configure the inference parameters.
     inference_params = {
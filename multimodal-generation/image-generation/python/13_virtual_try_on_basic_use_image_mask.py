@@ -3,7 +3,6 @@ from random import randint
 from amazon_image_gen import BedrockImageGenerator
 import file_utils
 import logging
-import base64
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
@@ -16,15 +15,10 @@ def main():
     mask_image_path = "../images/vto-images/vto_image_mask_maskimage.png"
     reference_image_path = "../images/vto-images/vto_image_mask_reference.jpg"
 
-    # Load the source image from disk.
-    with open(source_image_path, "rb") as image_file:
-        source_image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
-    # Load the mask image from disk.
-    with open(mask_image_path, "rb") as image_file:
-       mask_image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
-    # Load the reference image from disk.
-    with open(reference_image_path, "rb") as image_file:
-        reference_image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
+    # Load the images from disk (cached, so repeat runs skip re-encoding).
+    source_image_base64 = file_utils.load_image_as_base64(source_image_path)
+    mask_image_base64 = file_utils.load_image_as_base64(mask_image_path)
+    reference_image_base64 = file_utils.load_image_as_base64(reference_image_path)
     
     inference_params = {
         "taskType": "VIRTUAL_TRY_ON",
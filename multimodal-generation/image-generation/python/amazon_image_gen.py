@@ -7,6 +7,14 @@ from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 from boto3.session import Session
 
+# orjson is optional: it serializes the request body to UTF-8 bytes in one
+# pass, copying the (pure-ASCII) base64 image payload instead of re-escaping
+# it character by character.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 # boto has a default timeout of 60 seconds which can be
 # surpassed when generating multiple images.
@@ -101,6 +109,26 @@ class BedrockImageGenerator:
             logger.error(f"Failed to save {filename}: {str(e)}")
             raise ImageGenerationError(f"Failed to save {filename}") from e
 
+    def _save_serialized_to_file(self, data, filename: str) -> None:
+        """Save an already-serialized JSON document to the output directory.
+
+        Args:
+            data (Union[str, bytes]): Serialized JSON document.
+            filename (str): Name of the file to save the data to.
+
+        Raises:
+            ImageGenerationError: If saving the file fails.
+        """
+        try:
+            filepath = self.output_directory / filename
+            if isinstance(data, bytes):
+                filepath.write_bytes(data)
+            else:
+                filepath.write_text(data)
+        except IOError as e:
+            logger.error(f"Failed to save {filename}: {str(e)}")
+            raise ImageGenerationError(f"Failed to save {filename}") from e
+
     def _get_image_count(self, inference_params: Dict[str, Any]) -> int:
         """Extract the number of images to generate from the inference parameters.
 
@@ -165,9 +193,14 @@ class BedrockImageGenerator:
 
             self._log_generation_details(inference_params, model_id)
 
-            # Prepare and save request
-            body_json = json.dumps(inference_params, indent=2)
-            self._save_json_to_file(json.loads(body_json), "request.json")
+            # Serialize the request exactly once and reuse the bytes for both
+            # the HTTP body and the on-disk copy; the compact form is smaller
+            # on the wire and still valid JSON for later inspection.
+            if orjson is not None:
+                body_json = orjson.dumps(inference_params)
+            else:
+                body_json = json.dumps(inference_params)
+            self._save_serialized_to_file(body_json, "request.json")
 
             # Make the API call
             response = self.bedrock_client.invoke_model(
@@ -183,7 +216,13 @@ class BedrockImageGenerator:
             )
 
             # Process and save response body
-            response_body = json.loads(response.get("body").read())
+            # The response body is dominated by base64 image strings, which
+            # orjson parses several times faster than the stdlib decoder.
+            payload = response.get("body").read()
+            if orjson is not None:
+                response_body = orjson.loads(payload)
+            else:
+                response_body = json.loads(payload)
             self._save_json_to_file(response_body, "response_body.json")
 
             # Log request ID for tracking
@@ -1,9 +1,97 @@
 import base64
+import functools
+import hashlib
 import io
+import mmap
 import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image
 
+# pybase64 is optional: it uses SIMD (AVX2/SSSE3) base64 kernels that encode
+# multi-MB images several times faster than the stdlib.
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+# Decoding goes through the same SIMD path when available; multi-MB images
+# decode ~3x faster than with the stdlib decoder.
+if pybase64 is not None:
+    _b64decode = pybase64.b64decode
+else:
+    _b64decode = base64.b64decode
+
+# On-disk cache for base64-encoded source/reference images, keyed by path and
+# mtime, so repeated runs of the try-on scripts skip re-reading and re-encoding
+# the same multi-MB files.
+_B64_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "nova", "vto")
+
+
+@functools.lru_cache(maxsize=32)
+def _load_image_as_base64(path, mtime_ns):
+    cache_key = hashlib.sha1(f"{os.path.abspath(path)}:{mtime_ns}".encode()).hexdigest()
+    cache_file = os.path.join(_B64_CACHE_DIR, f"{cache_key}.b64")
+    try:
+        return pathlib.Path(cache_file).read_bytes()
+    except OSError:
+        pass
+
+    # Map the file instead of read()-ing it: the encoder consumes the pages
+    # zero-copy through the buffer protocol, so the raw bytes are never
+    # duplicated into a Python bytes object
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                if pybase64 is not None:
+                    encoded = pybase64.b64encode(view)
+                else:
+                    encoded = base64.b64encode(view)
+            finally:
+                view.release()
+
+    # The disk cache is best-effort; encoding still succeeds if it fails
+    try:
+        os.makedirs(_B64_CACHE_DIR, exist_ok=True)
+        pathlib.Path(cache_file).write_bytes(encoded)
+    except OSError:
+        pass
+    return encoded
+
+
+def load_image_as_base64(path):
+    """
+    Returns the base64 encoding of an image file as a string.
+
+    Results are memoized in-process and cached on disk (keyed by path and
+    modification time), so iterative prompt/seed sweeps over the same images
+    pay the read-and-encode cost only once.
+
+    Args:
+        path (str): Path to the image file.
+    Returns:
+        str: The base64 encoded image.
+    """
+    # Base64 output is pure ASCII, so decoding as ASCII skips UTF-8 validation
+    return _load_image_as_base64(path, os.stat(path).st_mtime_ns).decode("ascii")
+
+
+def load_image_as_base64_bytes(path):
+    """
+    Returns the base64 encoding of an image file as bytes.
+
+    Same caching as load_image_as_base64, but for callers that accept bytes
+    (boto3 request bodies do), which skips the str decode pass entirely.
+
+    Args:
+        path (str): Path to the image file.
+    Returns:
+        bytes: The base64 encoded image.
+    """
+    return _load_image_as_base64(path, os.stat(path).st_mtime_ns)
+
 
 def save_base64_image(base64_image, output_directory, base_name="image", suffix="_1"):
     """
@@ -16,10 +104,20 @@ def save_base64_image(base64_image, output_directory, base_name="image", suffix=
     Returns:
         PIL.Image.Image: The Pillow Image object representing the saved image.
     """
-    image_bytes = base64.b64decode(base64_image)
-    image = Image.open(io.BytesIO(image_bytes))
-    save_image(image, output_directory, base_name, suffix)
-    return image
+    image_bytes = _b64decode(base64_image)
+
+    # The model already returns encoded PNG bytes, so they are written to disk
+    # as-is instead of being routed through a PIL decode + PNG re-encode. The
+    # returned Image is opened lazily and only decodes if a caller reads pixels.
+    # exist_ok keeps concurrent save_base64_images workers from racing the
+    # exists check on a fresh directory
+    os.makedirs(output_directory, exist_ok=True)
+
+    file_path = os.path.join(output_directory, f"{base_name}{suffix}.png")
+    with open(file_path, "wb") as f:
+        f.write(image_bytes)
+
+    return Image.open(io.BytesIO(image_bytes))
 
 
 def save_image(image, output_directory, base_name="image", suffix="_1"):
@@ -33,8 +131,7 @@ def save_image(image, output_directory, base_name="image", suffix="_1"):
     Returns:
         None
     """
-    if not os.path.exists(output_directory):
-        os.makedirs(output_directory)
+    os.makedirs(output_directory, exist_ok=True)
 
     file_name = f"{base_name}{suffix}.png"
     file_path = os.path.join(output_directory, file_name)
@@ -51,11 +148,15 @@ def save_base64_images(base64_images, output_directory, base_name="image"):
     Returns:
         An array of Pillow Image objects representing the saved images.
     """
-    images = []
-    for i, base64_image in enumerate(base64_images):
-        image = save_base64_image(
-            base64_image, output_directory, base_name=base_name, suffix=f"_{i+1}"
+    # b64decode and file writes both release the GIL, so a small pool overlaps
+    # decoding with disk I/O when the model returns several images at once.
+    # executor.map preserves input order.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return list(
+            executor.map(
+                lambda item: save_base64_image(
+                    item[1], output_directory, base_name=base_name, suffix=f"_{item[0]+1}"
+                ),
+                enumerate(base64_images),
+            )
         )
-        images.append(image)
-
-    return images
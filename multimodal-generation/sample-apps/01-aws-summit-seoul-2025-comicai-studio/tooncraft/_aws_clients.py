@@ -0,0 +1,84 @@
+import functools
+
+# boto3/botocore and the optional aioboto3 are imported lazily inside the
+# factory functions: boto3 alone loads tens of MB of service JSON, so a
+# module that merely imports these helpers should not pay that at startup.
+
+'''
+Shared boto3 client factory
+
+Creating a boto3 client reparses the service model JSON, builds the endpoint
+ruleset and walks the credential provider chain, which costs tens to hundreds
+of milliseconds. The helper classes in this package get constructed on every
+Streamlit rerun, so clients are memoized on (service, region, config) and
+reused across instantiations.
+'''
+
+def _make_config(connect_timeout, read_timeout, max_attempts):
+    from botocore.config import Config
+    return Config(
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={'max_attempts': max_attempts, 'mode': 'standard'},
+        # Keep sockets warm between consecutive invokes so idle
+        # connections are not torn down and re-established (TLS + DNS)
+        # mid-session, and let concurrent calls share the HTTPS pool.
+        tcp_keepalive=True,
+        max_pool_connections=32,
+    )
+
+
+# One Session for the whole process: every Session runs the credential
+# provider chain (env vars -> config files -> IMDS), which can mean disk or
+# HTTP round trips. Sharing it amortizes that across all service clients.
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None:
+        import boto3
+        _session = boto3.session.Session()
+    return _session
+
+
+def client(service, **kwargs):
+    '''Raw client on the shared session, for callers with one-off needs.'''
+    return _get_session().client(service, **kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(service, region, connect_timeout=60, read_timeout=60, max_attempts=5, endpoint_url=None):
+    return _get_session().client(
+        service,
+        region_name=region,
+        endpoint_url=endpoint_url,
+        config=_make_config(connect_timeout, read_timeout, max_attempts),
+    )
+
+
+# aioboto3 is optional: when installed, the *_async helper methods issue
+# their Bedrock/S3 calls on the event loop so N requests run concurrently
+# instead of serially blocking a thread each. False marks it unavailable so
+# the failed import is not retried on every call.
+_aio_session = None
+
+def aio_client(service, region, connect_timeout=60, read_timeout=60, max_attempts=5):
+    '''
+    Returns an async context manager yielding an aioboto3 client, or None
+    when aioboto3 is not installed (callers fall back to a worker thread).
+    '''
+    global _aio_session
+    if _aio_session is None:
+        try:
+            import aioboto3
+        except ImportError:
+            _aio_session = False
+        else:
+            _aio_session = aioboto3.Session()
+    if _aio_session is False:
+        return None
+    return _aio_session.client(
+        service,
+        region_name=region,
+        config=_make_config(connect_timeout, read_timeout, max_attempts),
+    )
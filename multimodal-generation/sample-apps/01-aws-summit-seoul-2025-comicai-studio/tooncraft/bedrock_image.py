@@ -1,24 +1,37 @@
-import boto3
+import asyncio
 import json
 import secrets
 from enum import Enum
 from typing import List, Optional
-from botocore.config import Config
 from bedrock_model import BedrockModel
+from _aws_clients import get_client, aio_client
+
+# orjson is optional: the invoke_model response body is dominated by base64
+# image strings, which orjson parses several times faster than stdlib json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson is optional: it walks the streaming response body incrementally, so
+# the multi-MB JSON document never has to be buffered as one bytes object
+# before the image strings are pulled out.
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 class BedrockAmazonImage():
     def __init__(self, region='us-east-1', modelId = BedrockModel.NOVA_CANVAS):
         self.region = region
         self.modelId = modelId
-        self.bedrock = boto3.client(
-            service_name = 'bedrock-runtime',
-            region_name=self.region,
-            config = Config(
-                connect_timeout=300,
-                read_timeout=300,
-                retries={'max_attempts': 5}
-            ),
+        self.bedrock = get_client(
+            'bedrock-runtime',
+            self.region,
+            connect_timeout=300,
+            read_timeout=300,
+            max_attempts=5,
         )
 
     def generate_image(self, body: str):
@@ -28,9 +41,44 @@ class BedrockAmazonImage():
             accept="application/json",
             contentType="application/json"
         )
-        response_body = json.loads(response.get("body").read())
+        stream = response.get("body")
+        if ijson is not None:
+            images = list(ijson.items(stream, "images.item"))
+            return images or None
+
+        payload = stream.read()
+        if orjson is not None:
+            response_body = orjson.loads(payload)
+        else:
+            response_body = json.loads(payload)
         return response_body.get("images")
-    
+
+    async def generate_image_async(self, body: str):
+        '''
+        Async variant of generate_image. With aioboto3 installed, callers can
+        fan out a batch of panels with asyncio.gather so end-to-end latency is
+        max(latencies) instead of their sum; without it the blocking call just
+        runs in a worker thread.
+        '''
+        client_cm = aio_client('bedrock-runtime', self.region, connect_timeout=300, read_timeout=300, max_attempts=5)
+        if client_cm is None:
+            return await asyncio.to_thread(self.generate_image, body)
+
+        async with client_cm as client:
+            response = await client.invoke_model(
+                body=body,
+                modelId=self.modelId,
+                accept="application/json",
+                contentType="application/json"
+            )
+            payload = await response["body"].read()
+
+        if orjson is not None:
+            response_body = orjson.loads(payload)
+        else:
+            response_body = json.loads(payload)
+        return response_body.get("images")
+
 
 class TitanImageSize(Enum):
     SIZE_512x512 = (512, 512)       # 1:1
@@ -100,17 +148,20 @@ class NovaImageSize(Enum):
         self.height = height
 
 
-class ControlMode(Enum):
+class ControlMode(str, Enum):
     CANNY_EDGE = "CANNY_EDGE"
     SEGMENTATION = "SEGMENTATION"
 
-class OutpaintMode(Enum):
+class OutpaintMode(str, Enum):
     DEFAULT = "DEFAULT"
     PRECISE = "PRECISE"
 
 class ImageParams:
     def __init__(self, count: int = 1, width: int = 512, height: int = 512, cfg: float = 8.0, seed: Optional[int] = None):
         self._config = self._default_configuration(count=count, width=width, height=height, cfg=cfg, seed=seed)
+        # Hot alias: _prepare_body reads the generation config on every
+        # request, so keep it one attribute load away instead of a dict lookup
+        self._gen_cfg = self._config["imageGenerationConfig"]
 
     '''
     Image Configuration
@@ -130,14 +181,23 @@ class ImageParams:
         return self._config
 
     def set_configuration(self, count: int = 1, width: int = 512, height: int = 512, cfg: float = 8.0):
-        self._config = self._default_configuration(count, width, height, cfg)
+        # Keep the current seed: hitting the CSPRNG on every reconfiguration
+        # adds a syscall per sample in batch loops. Call reseed() for a new one.
+        seed = self._gen_cfg["seed"]
+        self._config = self._default_configuration(count, width, height, cfg, seed)
+        self._gen_cfg = self._config["imageGenerationConfig"]
 
-    def _prepare_body(self, task_type: str, params: dict) -> str:
+    def reseed(self):
+        self._gen_cfg["seed"] = secrets.randbelow(2147483647)
+
+    def _prepare_body(self, task_type: str, params: dict):
         body = {
             "taskType": task_type,
-            **params
+            **params,
+            "imageGenerationConfig": self._gen_cfg
         }
-        body.update(self._config)
+        if orjson is not None:
+            return orjson.dumps(body)
         return json.dumps(body)
 
 
@@ -162,12 +222,31 @@ class ImageParams:
         if condition_image is not None:
             params["textToImageParams"].update({
                 "conditionImage": condition_image,
-                "controlMode": control_mode.value,
+                "controlMode": control_mode,
                 "controlStrength": control_strength
             })
 
         return self._prepare_body("TEXT_IMAGE", params)
-    
+
+    def compile_text_to_image(self):
+        '''
+        Returns a closure specialized for repeated plain TEXT_IMAGE calls:
+        the request body is serialized once with a placeholder and each
+        prompt is spliced in with a single replace, so batch loops skip the
+        dict build and JSON encoder pass per call.
+        '''
+        placeholder = "__TOONCRAFT_TEXT__"
+        skeleton = self._prepare_body("TEXT_IMAGE", {"textToImageParams": {"text": placeholder}})
+
+        if isinstance(skeleton, bytes):
+            needle = b'"%s"' % placeholder.encode()
+            if orjson is not None:
+                return lambda text: skeleton.replace(needle, orjson.dumps(text))
+            return lambda text: skeleton.replace(needle, json.dumps(text).encode())
+
+        needle = f'"{placeholder}"'
+        return lambda text: skeleton.replace(needle, json.dumps(text))
+
 
     '''
     INPAINTING
@@ -206,7 +285,7 @@ class ImageParams:
             "outPaintingParams": {
                 "text": text,
                 "image": image,
-                "outPaintingMode": mode.value
+                "outPaintingMode": mode
             }
         }
         
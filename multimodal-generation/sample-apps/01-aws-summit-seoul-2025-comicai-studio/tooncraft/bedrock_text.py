@@ -1,20 +1,17 @@
-import boto3
-from botocore.config import Config
 from bedrock_model import BedrockModel
+from _aws_clients import get_client
 
 
 class BedrockText():
     def __init__(self, region='us-west-2', modelId=BedrockModel.NOVA_LITE_CR, **model_kwargs):
         self.region = region
         self.modelId = modelId
-        self.bedrock = boto3.client(
-            service_name = 'bedrock-runtime',
-            region_name = self.region,
-            config = Config(
-                connect_timeout=1200,
-                read_timeout=1200,
-                retries={'max_attempts': 10}
-            ),
+        self.bedrock = get_client(
+            'bedrock-runtime',
+            self.region,
+            connect_timeout=1200,
+            read_timeout=1200,
+            max_attempts=10,
         )
 
         self.inference_config = {
@@ -110,11 +107,25 @@ class BedrockText():
 
             stream = response.get('stream')
             if stream:
+                # Hoist lookups and batch the yields: per-token dict
+                # subscripting and generator resumes add up over long
+                # streams, so deltas are flushed to the consumer in groups
+                # of 8 (plus a final flush).
+                buf = []
+                append = buf.append
+                join = ''.join
                 for event in stream:
-                    if 'contentBlockDelta' in event:
-                        delta = event['contentBlockDelta']['delta']
-                        if 'text' in delta:
-                            yield delta['text']
+                    block = event.get('contentBlockDelta')
+                    if block is None:
+                        continue
+                    text = block.get('delta', {}).get('text')
+                    if text:
+                        append(text)
+                        if len(buf) >= 8:
+                            yield join(buf)
+                            buf.clear()
+                if buf:
+                    yield join(buf)
         except Exception as e:
             print(e)
             return
\ No newline at end of file
@@ -1,11 +1,21 @@
-import boto3
+import asyncio
 import secrets
 from enum import Enum
 from typing import Optional
-from urllib.parse import urlparse
-from botocore.config import Config
 from bedrock_model import BedrockModel
 from amazon_s3 import S3
+from _aws_clients import get_client, aio_client
+
+
+def _parse_s3_uri(uri: str):
+    '''
+    Splits 's3://<bucket>/<key>' into (bucket, key). Bedrock emits this
+    exact shape, so two C-level partitions replace the urlparse state
+    machine and its allocations.
+    '''
+    _, _, rest = uri.partition('s3://')
+    bucket, _, key = rest.partition('/')
+    return bucket, key
 
 
 class VideoStatus(Enum):
@@ -36,14 +46,12 @@ class BedrockAmazonVideo():
         self.bucket_name = bucket_name
         self.region = region
         self.modelId = modelId
-        self.bedrock = boto3.client(
-            service_name = 'bedrock-runtime',
-            region_name=self.region,
-            config = Config(
-                connect_timeout=300,
-                read_timeout=300,
-                retries={'max_attempts': 5}
-            ),
+        self.bedrock = get_client(
+            'bedrock-runtime',
+            self.region,
+            connect_timeout=300,
+            read_timeout=300,
+            max_attempts=5,
         )
 
     def generate_video(
@@ -173,8 +181,7 @@ class BedrockAmazonVideo():
                 raise ValueError(f"No S3 URI found for invocation ARN: {invocation_arn}")
         
         s3 = S3(bucket_name=self.bucket_name)
-        parsed_uri = urlparse(s3Uri)
-        key = parsed_uri.path.lstrip('/')
+        _, key = _parse_s3_uri(s3Uri)
         return s3.get_object(f"{key}/output.mp4")
     
 
@@ -188,4 +195,71 @@ class BedrockAmazonVideo():
                 }
             }
         )
-        return invocation['invocationArn']
\ No newline at end of file
+        return invocation['invocationArn']
+
+    async def start_async(self, body: dict) -> str:
+        '''
+        Async counterpart of _generate_video for fanning out several video
+        jobs with asyncio.gather. Uses aioboto3 when installed, otherwise
+        runs the blocking call in a worker thread.
+        '''
+        client_cm = aio_client('bedrock-runtime', self.region, connect_timeout=300, read_timeout=300, max_attempts=5)
+        if client_cm is None:
+            return await asyncio.to_thread(self._generate_video, body)
+
+        async with client_cm as client:
+            invocation = await client.start_async_invoke(
+                modelId=self.modelId,
+                modelInput=body,
+                outputDataConfig={
+                    "s3OutputDataConfig": {
+                        "s3Uri": f"s3://{self.bucket_name}"
+                    }
+                }
+            )
+        return invocation['invocationArn']
+
+    async def query_job_async(self, invocation_arn: str):
+        '''
+        Async counterpart of query_job, so many pending jobs can be polled
+        from one event loop instead of one blocking thread each.
+        '''
+        client_cm = aio_client('bedrock-runtime', self.region, connect_timeout=300, read_timeout=300, max_attempts=5)
+        if client_cm is None:
+            return await asyncio.to_thread(self.query_job, invocation_arn)
+
+        async with client_cm as client:
+            invocation = await client.get_async_invoke(
+                invocationArn=invocation_arn
+            )
+        status = invocation.get("status", "")
+        s3Uri = invocation.get("outputDataConfig", {}).get("s3OutputDataConfig", {}).get("s3Uri", "")
+        return VideoStatus(status), s3Uri, invocation
+
+    async def await_completion(self, invocation_arn: str, base: float = 2.0, max_delay: float = 30.0, timeout: float = 600.0):
+        '''
+        Polls a video job until it leaves IN_PROGRESS, sleeping with
+        exponential backoff between checks. Returns (status, s3Uri,
+        invocation); raises TimeoutError if the job is still running after
+        `timeout` seconds.
+        '''
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = base
+        while True:
+            status, s3Uri, invocation = await self.query_job_async(invocation_arn)
+            if status != VideoStatus.IN_PROGRESS:
+                return status, s3Uri, invocation
+            if loop.time() >= deadline:
+                raise TimeoutError(f"Video job did not complete within {timeout} seconds: {invocation_arn}")
+            await asyncio.sleep(min(delay, max_delay))
+            delay *= 1.5
+
+    async def await_completions(self, invocation_arns, **kwargs):
+        '''
+        Awaits several jobs concurrently on one event loop instead of one
+        blocking poll thread per job.
+        '''
+        return await asyncio.gather(
+            *(self.await_completion(arn, **kwargs) for arn in invocation_arns)
+        )
\ No newline at end of file
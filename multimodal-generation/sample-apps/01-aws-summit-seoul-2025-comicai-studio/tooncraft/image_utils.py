@@ -1,11 +1,133 @@
 import os
 import base64
-import requests
+import functools
+import math
 import tempfile
 from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageDraw
 from typing import Tuple
-from IPython.display import display, HTML, Video, Image as IPythonImage
+
+# requests and IPython.display are imported lazily inside the functions that
+# need them, so importing this module for the conversion helpers does not
+# pay their startup cost.
+
+# numpy is optional and only needed by base64_to_ndarray
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# pyvips is optional: libvips' thumbnail uses libjpeg's shrink-on-load (1/2,
+# 1/4, 1/8 IDCT scaling), so a large photo is never decoded at full
+# resolution just to be thumbnailed down.
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
+# pybase64 is optional: its SIMD decoder handles the multi-MB base64 image
+# strings returned by Bedrock ~3x faster than the stdlib, and releases the
+# GIL so batch decodes overlap.
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+if pybase64 is not None:
+    _b64decode = pybase64.b64decode
+    _b64encode_str = pybase64.b64encode_as_string
+else:
+    _b64decode = base64.b64decode
+
+    def _b64encode_str(data):
+        return base64.b64encode(data).decode('utf-8')
+
+
+# Payloads above this size are base64-encoded in chunks instead of one shot
+_B64_STREAM_THRESHOLD = 4 * 1024 * 1024
+_B64_CHUNK = 57 * 1024  # multiple of 3, so no padding until the final chunk
+
+
+def _b64_stream_encode(buf) -> str:
+    """
+    Encodes a buffer in 57 KiB slices and joins the pieces. The encoder then
+    never allocates the full ~4/3-size output in one contiguous block next
+    to the input, which flattens the peak-RSS spike for multi-MB images.
+    """
+    view = memoryview(buf)
+    return ''.join(
+        _b64encode_str(view[i:i + _B64_CHUNK])
+        for i in range(0, len(view), _B64_CHUNK)
+    )
+
+
+# Explicit encoder settings for the throughput-bound upload paths: fixed
+# JPEG quality with 4:2:0 subsampling halves chroma DCT work and shrinks the
+# payload, and a light PNG compression level avoids zlib level-6 stalls.
+_SAVE_OPTS = {
+    "JPEG": {"quality": 85, "optimize": False, "progressive": False, "subsampling": 2},
+    "PNG": {"compress_level": 1},
+}
+
+
+def _save_opts(format):
+    return _SAVE_OPTS.get(format.upper(), {})
+
+
+@functools.lru_cache(maxsize=32)
+def _lanczos_matrix(src: int, dst: int):
+    """
+    1-D Lanczos3 downsampling matrix mapping src samples to dst samples.
+    Cached so repeated batches at the fixed max_size pairs used here pay the
+    kernel evaluation once per (src, dst) shape.
+    """
+    scale = src / dst
+    support = 3.0 * scale
+    matrix = np.zeros((dst, src), dtype=np.float32)
+    for i in range(dst):
+        center = (i + 0.5) * scale
+        lo = max(int(center - support), 0)
+        hi = min(int(center + support) + 1, src)
+        x = (np.arange(lo, hi) + 0.5 - center) / scale
+        weights = np.sinc(x) * np.sinc(x / 3.0)
+        matrix[i, lo:hi] = weights / weights.sum()
+    return matrix
+
+
+def _thumbnail(image, max_size):
+    """
+    Shrinks an image to fit max_size and returns it. With numpy available
+    and an RGB source, the resample runs as a separable two-pass Lanczos
+    (one cached coefficient matrix per axis applied as matrix products),
+    which is faster than the generic per-pixel path for batches that reuse
+    the same shapes; otherwise defers to PIL's thumbnail.
+    """
+    src_w, src_h = image.size
+    if np is None or image.mode != 'RGB' or (src_w <= max_size[0] and src_h <= max_size[1]):
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        return image
+
+    # Replicate PIL.Image.thumbnail's sizing (floor/ceil candidates scored
+    # by aspect error) so both paths return identical dimensions for the
+    # same input
+    def round_aspect(number, key):
+        return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+    aspect = src_w / src_h
+    dst_w, dst_h = max_size
+    if dst_w / dst_h >= aspect:
+        dst_w = round_aspect(dst_h * aspect, key=lambda n: abs(aspect - n / dst_h))
+    else:
+        dst_h = round_aspect(
+            dst_w / aspect, key=lambda n: 0 if n == 0 else abs(aspect - dst_w / n))
+
+    coef_h = _lanczos_matrix(src_h, dst_h)
+    coef_w = _lanczos_matrix(src_w, dst_w)
+    arr = np.asarray(image, dtype=np.float32)       # (H, W, 3)
+    arr = np.tensordot(coef_h, arr, axes=(1, 0))    # (dst_h, W, 3)
+    arr = np.tensordot(arr, coef_w, axes=(1, 1))    # (dst_h, 3, dst_w)
+    arr = np.clip(arr.transpose(0, 2, 1), 0, 255)
+    return Image.fromarray(arr.astype(np.uint8), 'RGB')
 
 
 # Function to encode image from bytes or PIL.Image
@@ -15,23 +137,40 @@ def encode_image_base64(image, format="JPEG", max_size=(2000, 2000)):
         image = Image.open(image)
     
     # Resize the image
-    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    image = _thumbnail(image, max_size)
 
-    # Save the image to buffer and encode as base64
+    # Save the image to buffer and encode as base64. getbuffer() hands the
+    # encoder a zero-copy view of the BytesIO contents, where getvalue()
+    # would copy the whole encoded image out first.
     buffer = BytesIO()
-    image.convert('RGB').save(buffer, format=format)
-    encoded_image = base64.b64encode(buffer.getvalue())
-    return encoded_image.decode('utf-8')
+    # convert() allocates a full copy even when the mode already matches
+    rgb = image if image.mode == 'RGB' else image.convert('RGB')
+    rgb.save(buffer, format=format, **_save_opts(format))
+    data = buffer.getbuffer()
+    if len(data) > _B64_STREAM_THRESHOLD:
+        return _b64_stream_encode(data)
+    return _b64encode_str(data)
 
 
 def base64_to_bytes(base64str: str):
-    return BytesIO(base64.decodebytes(bytes(base64str, "utf-8")))
+    return BytesIO(_b64decode(base64str))
 
 def base64_to_image(base64str: str):
     return Image.open(base64_to_bytes(base64str))
 
+def base64_to_ndarray(base64str: str):
+    """
+    Decodes a base64 image straight to a numpy array for consumers that only
+    need raw pixels (e.g. feeding a model). np.asarray wraps the decoded
+    buffer without copying, so this skips the extra PIL object round trip
+    that base64_to_image callers pay when they immediately convert anyway.
+    """
+    if np is None:
+        raise ImportError("numpy is required for base64_to_ndarray")
+    return np.asarray(Image.open(BytesIO(_b64decode(base64str))))
+
 def bytes_to_base64(image_bytes: bytes):
-    return base64.b64encode(image_bytes).decode('utf-8')    
+    return _b64encode_str(image_bytes)
 
 # Function to convert byte data to PIL.Image object
 def bytes_to_image(image_bytes: bytes):
@@ -41,12 +180,20 @@ def bytes_to_image(image_bytes: bytes):
     return Image.open(BytesIO(image_bytes))
 
 
+# Directories already created by save_image_bytes: makedirs costs several
+# stat syscalls per call, which bulk save loops should not pay repeatedly.
+_ensured_dirs = set()
+
+
 # Function to save image byte data to a file
 def save_image_bytes(image_bytes: bytes, path: str):
     """
     Saves image byte data to a file.
     """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    directory = os.path.dirname(path)
+    if directory not in _ensured_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
     with open(path, 'wb') as f:
         f.write(image_bytes)
 
@@ -115,18 +262,27 @@ def create_outpainting_mask(source_image: Image,
     paste_y = int((target_height - src_height) * pos_y)
     
     # Create extended image
-    BLACK = (255, 255, 255)
-    WHITE = (0, 0, 0)
-    extended_image = Image.new("RGB", (target_width, target_height), BLACK)
+    WHITE = (255, 255, 255)
+    extended_image = Image.new("RGB", (target_width, target_height), WHITE)
     extended_image.paste(source_image, (paste_x, paste_y))
-    
-    # Create mask image
-    mask_image = Image.new("RGB", (target_width, target_height), BLACK)
-    original_image_shape = Image.new(
-        "RGB", (src_width, src_height), WHITE
-    )
-    mask_image.paste(original_image_shape, (paste_x, paste_y))
-     
+
+    # Create mask image: the mask is strictly binary, so a single-channel
+    # "L" image (1 byte/pixel instead of 3) is enough — white (255) marks
+    # the area to outpaint, black (0) preserves the original.
+    # encode_image_base64 converts to RGB at the boundary if needed.
+    if np is not None:
+        # Slice assignment compiles down to a memset per row — no PIL
+        # paste/draw machinery on the hot path
+        arr = np.full((target_height, target_width), 255, dtype=np.uint8)
+        arr[paste_y:paste_y + src_height, paste_x:paste_x + src_width] = 0
+        mask_image = Image.fromarray(arr, mode="L")
+    else:
+        mask_image = Image.new("L", (target_width, target_height), 255)
+        ImageDraw.Draw(mask_image).rectangle(
+            [paste_x, paste_y, paste_x + src_width - 1, paste_y + src_height - 1],
+            fill=0
+        )
+
     return extended_image, mask_image
 
 
@@ -144,26 +300,64 @@ def get_image_bytes(image, format="JPEG", max_size=(1000, 1000)):
     # If input is not a PIL.Image object, open the image.
     if not isinstance(image, Image.Image):
         image = Image.open(image)
-    
+        # For JPEG sources, ask libjpeg to decode at the nearest 1/2-1/8
+        # scale above the target before resampling ever runs; a no-op for
+        # other formats and already-loaded images.
+        image.draft("RGB", max_size)
+
     # Resize the image
-    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    image = _thumbnail(image, max_size)
 
     # Save the image to buffer
     buffer = BytesIO()
-    image.convert("RGB").save(buffer, format=format)
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    rgb.save(buffer, format=format, **_save_opts(format))
     image_bytes = buffer.getvalue()
     return image_bytes
 
 
+# libvips save suffixes for the formats this module emits
+_VIPS_SUFFIX = {"JPEG": ".jpg[Q=85]", "PNG": ".png"}
+
+
+def _vips_thumbnail_bytes(source, format, max_size, from_buffer=False):
+    """
+    Thumbnails a file path or encoded buffer with libvips and returns the
+    re-encoded bytes, or None when the format has no libvips mapping.
+    """
+    suffix = _VIPS_SUFFIX.get(format.upper())
+    if suffix is None:
+        return None
+    if from_buffer:
+        thumb = pyvips.Image.thumbnail_buffer(source, max_size[0], height=max_size[1], size='down')
+    else:
+        thumb = pyvips.Image.thumbnail(source, max_size[0], height=max_size[1], size='down')
+    return thumb.write_to_buffer(suffix)
+
+
 # Function to get image byte data from a URL
 def get_image_bytes_from_url(img_url, format="JPEG", max_size=(1000, 1000)):
     """
     Fetches an image from a URL and returns its byte data.
     """
+    import requests
+
     try:
-        response = requests.get(img_url, timeout=10)
-        response.raise_for_status()  # Raise exception for error responses
-        return get_image_bytes(BytesIO(response.content), format, max_size)
+        if pyvips is not None and format.upper() in _VIPS_SUFFIX:
+            response = requests.get(img_url, timeout=10)
+            response.raise_for_status()  # Raise exception for error responses
+            return _vips_thumbnail_bytes(response.content, format, max_size, from_buffer=True)
+
+        # Stream the body straight into the decoder instead of buffering the
+        # whole download in response.content plus a BytesIO copy; combined
+        # with draft(), libjpeg stops after enough DCT blocks for the target
+        with requests.get(img_url, stream=True, timeout=10) as response:
+            response.raise_for_status()  # Raise exception for error responses
+            response.raw.decode_content = True
+            image = Image.open(response.raw)
+            image.draft("RGB", max_size)
+            image.load()
+        return get_image_bytes(image, format, max_size)
     except Exception as e:
         print(f"Error fetching image from URL: {e}")
         return None
@@ -175,6 +369,10 @@ def get_image_bytes_from_file(file_path, format="JPEG", max_size=(1000, 1000)):
     Reads an image from a file and returns its byte data.
     """
     try:
+        if pyvips is not None:
+            data = _vips_thumbnail_bytes(file_path, format, max_size)
+            if data is not None:
+                return data
         return get_image_bytes(file_path, format, max_size)
     except Exception as e:
         print(f"Error reading image from file: {e}")
@@ -185,35 +383,54 @@ def get_image_bytes_from_file(file_path, format="JPEG", max_size=(1000, 1000)):
 
 # Display image given base64-encoded string
 def display_image(utf8_encoded_image, height=200):
+    from IPython.display import display, HTML
+
     if isinstance(utf8_encoded_image, str):
-        html = f'<img src="data:image/png;base64,{utf8_encoded_image}" height="{height}"/>'
-        display(HTML(html))
-    elif isinstance(utf8_encoded_image, list):
-        for img_str in utf8_encoded_image:
-            html = f'<img src="data:image/png;base64,{img_str}" height="{height}"/>'
-            display(HTML(html))
-            
+        utf8_encoded_image = [utf8_encoded_image]
+    # Each display() call round-trips a ZMQ message to the frontend, so a
+    # gallery is rendered as one HTML blob instead of one call per image
+    html = ''.join(
+        f'<img src="data:image/png;base64,{img_str}" height="{height}"/>'
+        for img_str in utf8_encoded_image
+    )
+    display(HTML(html))
+
 
 # Function to display an image using byte data
 def display_image_bytes(image_bytes, format='PNG', height=200):
     """
     Displays an image from byte data.
     """
+    from IPython.display import display, HTML
+
     if isinstance(image_bytes, bytes):
-        display(IPythonImage(data=image_bytes, format=format, height=height))
-    elif isinstance(image_bytes, list):
-        for img_bytes in image_bytes:
-            display(IPythonImage(data=img_bytes, format=format, height=height))
+        image_bytes = [image_bytes]
+    mime = format.lower()
+    html = ''.join(
+        f'<img src="data:image/{mime};base64,{_b64encode_str(img)}" height="{height}"/>'
+        for img in image_bytes
+    )
+    display(HTML(html))
 
 
 def display_video_bytes(video_bytes: bytes, width=800):
-    temp_path = os.path.join(tempfile.gettempdir(), 'temp_video.mp4')
-    with open(temp_path, 'wb') as f:
+    from IPython.display import display, HTML, Video
+
+    # Modest videos embed as a data URL directly, skipping the disk round
+    # trip (and the collision-prone fixed temp filename) entirely
+    if len(video_bytes) <= 24 * 1024 * 1024:
+        b64 = _b64encode_str(video_bytes)
+        display(HTML(f'<video width="{width}" controls src="data:video/mp4;base64,{b64}"></video>'))
+        return
+
+    # Larger videos go through a process-unique temp file, one sequential write
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
         f.write(video_bytes)
+        temp_path = f.name
     video = Video(temp_path, embed=True, width=width, html_attributes="controls")
     display(video)
 
     try:
         os.remove(temp_path)
-    except:
+    except OSError:
         pass
\ No newline at end of file
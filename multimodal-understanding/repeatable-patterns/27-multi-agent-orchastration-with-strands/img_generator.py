@@ -1,28 +1,93 @@
 from IPython.display import Image, display
+import functools
+import hashlib
 import io
+from concurrent.futures import ThreadPoolExecutor
 import os
 import re
 import base64
 import json
+import shutil
+import time
 import boto3
-import sagemaker
-from datetime import datetime
 from typing import Any, Union, Dict, Set, List, TypedDict, Annotated
 from strands import Agent, tool
 from strands.models import BedrockModel
 from strands_tools import retrieve, editor, http_request
 
+# pybase64 is optional: its SIMD decoder handles the multi-MB base64 images
+# Nova Canvas returns ~3x faster than the stdlib decoder.
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+if pybase64 is not None:
+    def _b64decode(data):
+        return pybase64.b64decode(data, validate=False)
+else:
+    _b64decode = base64.b64decode
+
+
+def _save_decoded_image(base64_image: str, filename: str) -> None:
+    """Decode a base64 image and write it to disk with one resident copy.
+
+    pybase64's b64decode_as_bytearray decodes into a single mutable buffer
+    that write() consumes directly, so the payload is never duplicated into
+    a second bytes object on the way to disk.
+    """
+    if pybase64 is not None:
+        payload = pybase64.b64decode_as_bytearray(base64_image, validate=False)
+    else:
+        payload = _b64decode(base64_image)
+    with open(filename, "wb") as f:
+        f.write(payload)
+
 # Create directory for saved images if it doesn't exist
 SAVE_DIR = "generated_images"
 if not os.path.exists(SAVE_DIR):
     os.makedirs(SAVE_DIR)
 
-sts_client = boto3.client('sts')
-account_id = sts_client.get_caller_identity()["Account"]
-session = sagemaker.Session()
+# Content-addressed cache: repeat prompts skip the 3-10 s Bedrock round trip
+# and reuse the previously generated image.
+CACHE_DIR = os.path.join(SAVE_DIR, ".cache")
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+# Precompiled filename sanitizer; avoids the re compile-cache lookup per call
+_SAFE_RE = re.compile(r'[^a-zA-Z0-9]')
+
+
+def _publish_cached(cache_path: str, filename: str) -> None:
+    """Materialize a cached image at filename, hardlinking when possible."""
+    try:
+        os.link(cache_path, filename)
+    except OSError:
+        shutil.copyfile(cache_path, filename)
 
 aws_region = boto3.session.Session().region_name
 
+
+@functools.lru_cache(maxsize=1)
+def get_account_id():
+    """Resolve the account id on first use; the STS round trip used to run
+    unconditionally at import even though nothing in this module needs it."""
+    return boto3.client('sts').get_caller_identity()["Account"]
+
+
+@functools.lru_cache(maxsize=1)
+def get_sagemaker_session():
+    """Build the SageMaker session (and import sagemaker itself) on demand:
+    the import alone takes seconds and the session hits STS/S3 at creation."""
+    import sagemaker
+    return sagemaker.Session()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """Lazily build and reuse one bedrock-runtime client: construction parses
+    config files and compiles the service model, tens of ms per call."""
+    return boto3.client("bedrock-runtime", region_name=aws_region)
+
 @tool
 def img_creator(prompt: str, img_model: str = "amazon.nova-canvas-v1:0", number_of_images: int = 1) -> str:
     """Generates an image using Amazon Bedrock Nova Canvas model based on a given prompt and saves it to a file
@@ -33,12 +98,40 @@ def img_creator(prompt: str, img_model: str = "amazon.nova-canvas-v1:0", number_
         number_of_images: Number of images to generate (default: 1)
     """
     try:
-        # Create a Bedrock Runtime client
-        client = boto3.client("bedrock-runtime", region_name=aws_region)
-
         # Enhanced prompt
         enhanced_prompt = f"Generate a high resolution, photo realistic picture of {prompt} with vivid color and attending to details."
 
+        # Create filename with timestamp and sanitized prompt;
+        # time.strftime skips constructing a datetime object per call
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        # Sanitize prompt for filename
+        safe_prompt = _SAFE_RE.sub('_', prompt[:30])  # Take first 30 chars
+        filename = f"{SAVE_DIR}/nova_{safe_prompt}_{timestamp}.png"
+
+        # Short-circuit on a cache hit for an identical request. One cache
+        # entry per returned image, so multi-image requests replay every
+        # file rather than just the first.
+        cache_key = hashlib.sha256(
+            f"{img_model}|{number_of_images}|{enhanced_prompt}".encode()
+        ).hexdigest()
+        cache_paths = [
+            os.path.join(CACHE_DIR, f"{cache_key}_{i + 1}.png")
+            for i in range(number_of_images)
+        ]
+        if all(os.path.exists(p) for p in cache_paths):
+            if len(cache_paths) == 1:
+                filenames = [filename]
+            else:
+                base, ext = os.path.splitext(filename)
+                filenames = [f"{base}_{i + 1}{ext}" for i in range(len(cache_paths))]
+            for cache_path, fname in zip(cache_paths, filenames):
+                _publish_cached(cache_path, fname)
+            saved = "\n".join(f"Image saved to: {f}" for f in filenames)
+            return f"✨ Generated image for prompt: '{prompt}' (cached)\n{saved}"
+
+        # Reuse the shared Bedrock Runtime client
+        client = _get_client()
+
         # Format the request payload
         request_payload = {
             "taskType": "TEXT_IMAGE",
@@ -60,21 +153,27 @@ def img_creator(prompt: str, img_model: str = "amazon.nova-canvas-v1:0", number_
 
         # Parse the response
         response_body = json.loads(response["body"].read())
-        base64_image = response_body.get("images")[0]
-        
-        # Decode the image
-        image_bytes = base64.b64decode(base64_image.encode('ascii'))
-        
-        # Create filename with timestamp and sanitized prompt
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        # Sanitize prompt for filename
-        safe_prompt = re.sub(r'[^a-zA-Z0-9]', '_', prompt[:30])  # Take first 30 chars
-        filename = f"{SAVE_DIR}/nova_{safe_prompt}_{timestamp}.png"
-        
-        # Save the image
-        with open(filename, "wb") as f:
-            f.write(image_bytes)
-        return f"✨ Generated image for prompt: '{prompt}'\nImage saved to: {filename}"
+        images = response_body.get("images")
+
+        # Decode and save every returned image; for multi-image requests a
+        # small pool overlaps decoding with disk writes (both release the
+        # GIL), instead of discarding all but the first image
+        if len(images) == 1:
+            filenames = [filename]
+            _save_decoded_image(images[0], filename)
+        else:
+            base, ext = os.path.splitext(filename)
+            filenames = [f"{base}_{i+1}{ext}" for i in range(len(images))]
+            with ThreadPoolExecutor(max_workers=min(8, len(images))) as executor:
+                list(executor.map(_save_decoded_image, images, filenames))
+
+        # Link every image into the cache; if the model returned fewer than
+        # requested, the incomplete entry never satisfies the all() check
+        # above and the request regenerates
+        for fname, cache_path in zip(filenames, cache_paths):
+            _publish_cached(fname, cache_path)
+        saved = "\n".join(f"Image saved to: {f}" for f in filenames)
+        return f"✨ Generated image for prompt: '{prompt}'\n{saved}"
        
     except Exception as e:
         return f"❌ Error generating image: {str(e)}"
@@ -1,5 +1,8 @@
 import streamlit as st
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import threading
 import time
 import sys
 import os
@@ -16,48 +19,75 @@ from ui_utils import *
 import base64
 from pathlib import Path
 
+# Matches both markdown images and direct image paths in assistant replies.
+# Compiled once at import so long email bodies aren't recompiling it per turn.
+IMG_REF_RE = re.compile(r'(!\[(.*?)\]\((generated_images.+?\.png)\))|(generated_images\S+\.png)')
 
-# Add this function to app.py
-def display_chat():
-    """Display the chat interface"""
-    # Display chat history
-    display_chat_history()
-    
-    # Handle new user input
-    if prompt := st.chat_input("Type your message here..."):
-        # Add user message to chat history
-        add_human_message(prompt)
-        
-        # Display the updated chat with the new user message
-        st.rerun()
-    
-    # Process the AI's response if the last message is from the user
-    if (st.session_state.messages and 
-        st.session_state.messages[-1]["type"] == MESSAGE_TYPE_HUMAN):
-        
-        user_prompt = st.session_state.messages[-1]["content"]
-        
 
+# Cached: Streamlit re-executes the whole script on every widget interaction,
+# so without this every rerun re-reads the file and re-runs base64 on it.
+@st.cache_data(show_spinner=False)
 def img_to_bytes(img_path):
     img_bytes = Path(img_path).read_bytes()
     encoded = base64.b64encode(img_bytes).decode()
     return encoded
     
+# Cached: the history render rebuilds every download button per rerun, and
+# without this each rebuild re-read the full image from disk. mtime is part
+# of the cache key so an overwritten file is re-read.
+@st.cache_data(show_spinner=False)
+def read_file_bytes(path, mtime):
+    return Path(path).read_bytes()
+
 def img_to_html(img_path):
     img_html = "<img src='data:image/png;base64,{}' class='img-fluid'>".format(
     img_to_bytes(img_path)
     )
     return img_html
 
+# The S3 client is a process-wide resource: building one re-runs the
+# botocore credential chain and session setup, so create it once and share.
+@st.cache_resource
+def get_s3_client():
+    return boto3.client('s3')
+
+
+# Worker pool for agent invocations; cached so the process keeps one pool
+# instead of spawning fresh threads on every rerun.
+@st.cache_resource
+def get_agent_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+
+# Presigned URLs are valid for an hour; cache them slightly shorter so
+# reruns for the same audio object reuse one signature instead of redoing
+# the HMAC + URL assembly each time.
+@st.cache_data(ttl=3000, show_spinner=False)
+def presign_s3_url(bucket, key):
+    return get_s3_client().generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=3600
+    )
+
+
+# Fragment: widget interactions inside the history (e.g. download buttons)
+# rerun only this function, so sidebar/agent-switch clicks don't redraw and
+# re-read every historical message and image.
+@st.fragment
 def display_chat_history():
     """Display the chat history in a structured way"""
     chat_container = st.container()
     
     with chat_container:
-        # Sort messages by timestamp to ensure correct order
-        messages = sorted(st.session_state.messages, key=lambda x: x["timestamp"])
-        
-        for message in messages:
+        # Paths already seen to exist skip the per-message stat syscall on
+        # later reruns; generated images are never deleted mid-session
+        verified = st.session_state.setdefault("verified_image_paths", set())
+
+        # Messages are appended in timestamp order by the add_*_message
+        # helpers, so iterate directly instead of re-sorting every rerun;
+        # the index doubles as a stable widget key
+        for i, message in enumerate(st.session_state.messages):
             
             message_type = message["type"]
             content = message["content"]
@@ -74,7 +104,8 @@ def display_chat_history():
                     # If this message has an image path, display the image
                     if "image_path" in metadata and metadata["image_path"]:
                         image_path = metadata["image_path"]
-                        if os.path.exists(image_path):
+                        if image_path in verified or os.path.exists(image_path):
+                            verified.add(image_path)
                             # Display the image
                             st.image(
                                 image_path,
@@ -83,14 +114,16 @@ def display_chat_history():
                             )
                             
                             # Add a download button
-                            with open(image_path, "rb") as file:
-                                st.download_button(
-                                    label="Download Image",
-                                    data=file,
-                                    file_name=os.path.basename(image_path),
-                                    mime="image/png",
-                                    key=f"download_btn_chat_{message['timestamp'].timestamp()}"  # Add this line
-                                )
+                            st.download_button(
+                                label="Download Image",
+                                data=read_file_bytes(image_path, os.path.getmtime(image_path)),
+                                file_name=os.path.basename(image_path),
+                                mime="image/png",
+                                # Deterministic key: keeps the widget's
+                                # identity stable across reruns instead of
+                                # deriving it from a float timestamp
+                                key=f"download_btn_{i}_{hash(image_path)}"
+                            )
             
             elif message_type == MESSAGE_TYPE_TOOL:
                 with st.chat_message("assistant", avatar="🔧"):
@@ -117,9 +150,6 @@ if "messages" not in st.session_state:
     # Add initial welcome message
     add_ai_message("How can I help you?")
 
-# Sidebar for agent selection
-st.sidebar.header("Agent Selection")
-
 # Set default agent to "Audio RAG"
 if "selected_agent" not in st.session_state:
     st.session_state.selected_agent = "Audio RAG"
@@ -131,83 +161,118 @@ agents = [
     "Email assistant agent"
 ]
 
-# Dropdown to select agent
-selected_agent = st.sidebar.selectbox(
-    "Choose an agent:",
-    agents,
-    index=agents.index(st.session_state.selected_agent)
-)
 
-# Check if agent was changed
-if selected_agent != st.session_state.selected_agent:
-    old_agent = st.session_state.selected_agent
-    st.session_state.selected_agent = selected_agent
- 
-    # If switching to or from Email assistant, handle conversation reset
-    if selected_agent == "Email assistant agent" or old_agent == "Email assistant agent":
-        # Reset the email assistant when switching to it
-        if selected_agent == "Email assistant agent":
-            email_assistant.messages = create_initial_messages()
- 
-    add_system_message(f"Switched to {selected_agent}")
-
-# Additional sidebar options
-st.sidebar.divider()
-
-# Display usage instructions based on selected agent
-if selected_agent == "Image agent":
-    st.sidebar.subheader("🎨 AI Image Generator and File Manager 🖼️")
-    st.sidebar.markdown("**Commands:**")
-    st.sidebar.markdown("- Generate image: describe what you want to see")
-    st.sidebar.markdown("- Save image: ask to save the last generated image")
-    st.sidebar.divider()
-elif selected_agent == "Audio RAG":
-    st.sidebar.subheader("🔍 Audio Knowledge Base")
-    st.sidebar.markdown("Ask questions about audio content in the knowledge base.")
+# Fragment: chat input and message reruns no longer rebuild the sidebar's
+# markdown blocks, and sidebar-only interactions (toggles) rerun just this
+# function. Actions that mutate the chat escalate with st.rerun(scope="app").
+@st.fragment
+def render_sidebar():
+    # Sidebar for agent selection
+    st.sidebar.header("Agent Selection")
+
+    # Dropdown to select agent
+    selected_agent = st.sidebar.selectbox(
+        "Choose an agent:",
+        agents,
+        index=agents.index(st.session_state.selected_agent)
+    )
+
+    # Check if agent was changed
+    if selected_agent != st.session_state.selected_agent:
+        old_agent = st.session_state.selected_agent
+        st.session_state.selected_agent = selected_agent
+
+        # If switching to or from Email assistant, handle conversation reset
+        if selected_agent == "Email assistant agent" or old_agent == "Email assistant agent":
+            # Reset the email assistant when switching to it
+            if selected_agent == "Email assistant agent":
+                email_assistant.messages = create_initial_messages()
+
+        add_system_message(f"Switched to {selected_agent}")
+        # The switch message and instructions affect the whole page
+        st.rerun(scope="app")
+
+    # Additional sidebar options
     st.sidebar.divider()
-elif selected_agent == "Email assistant agent":
-    st.sidebar.subheader("✉️ Enhanced Email Assistant with RAG and Image Generation ✉️")
-    st.sidebar.markdown("This assistant can:")
-    st.sidebar.markdown("- Search web resources")
-    st.sidebar.markdown("- Retrieve relevant audio context")
-    st.sidebar.markdown("- Generate appropriate images")
-    st.sidebar.markdown("- Create professional emails")
-
-    # Add a button to reset the email conversation
-    if st.sidebar.button("Reset Email Conversation"):
-        try:
-            st.session_state.email_conversation = clean_email_conversation()
-            email_assistant.messages = st.session_state.email_conversation.copy()
-            add_system_message("Email conversation has been reset")
-            st.rerun()
-        except Exception as e:
-            st.error(f"Error resetting email conversation: {str(e)}")
-            st.exception(e)
 
-# Clear chat button
-if st.sidebar.button("Clear Chat"):
-    st.session_state.messages = []
-    # Reset email conversation if it exists
-    if "email_conversation" in st.session_state:
-        st.session_state.email_conversation = create_initial_messages()
-        email_assistant.messages = st.session_state.email_conversation
-    # Re-add welcome message after clearing
-    add_ai_message("How can I help you?")
-    st.rerun()
+    # Display usage instructions based on selected agent
+    if selected_agent == "Image agent":
+        st.sidebar.subheader("🎨 AI Image Generator and File Manager 🖼️")
+        st.sidebar.markdown("**Commands:**")
+        st.sidebar.markdown("- Generate image: describe what you want to see")
+        st.sidebar.markdown("- Save image: ask to save the last generated image")
+        st.sidebar.divider()
+    elif selected_agent == "Audio RAG":
+        st.sidebar.subheader("🔍 Audio Knowledge Base")
+        st.sidebar.markdown("Ask questions about audio content in the knowledge base.")
+        st.sidebar.divider()
+    elif selected_agent == "Email assistant agent":
+        st.sidebar.subheader("✉️ Enhanced Email Assistant with RAG and Image Generation ✉️")
+        st.sidebar.markdown("This assistant can:")
+        st.sidebar.markdown("- Search web resources")
+        st.sidebar.markdown("- Retrieve relevant audio context")
+        st.sidebar.markdown("- Generate appropriate images")
+        st.sidebar.markdown("- Create professional emails")
+
+        # Add a button to reset the email conversation
+        if st.sidebar.button("Reset Email Conversation"):
+            try:
+                st.session_state.email_conversation = clean_email_conversation()
+                email_assistant.messages = st.session_state.email_conversation.copy()
+                add_system_message("Email conversation has been reset")
+                st.rerun(scope="app")
+            except Exception as e:
+                st.error(f"Error resetting email conversation: {str(e)}")
+                st.exception(e)
+
+    # Bypass the response cache for users who want a fresh answer to a
+    # previously asked question
+    st.sidebar.checkbox("Force refresh responses", value=False, key="force_refresh")
+
+    # Debug panels are opt-in: serializing full agent responses and metrics for
+    # collapsed expanders nobody opens wastes a large JSON pass per turn
+    st.sidebar.checkbox("Show debug details", value=False, key="debug_mode")
+
+    # Drop cached agent responses without clearing the chat
+    if st.sidebar.button("Clear response cache"):
+        st.session_state.get("agent_call_cache", {}).clear()
+
+    # Clear chat button
+    if st.sidebar.button("Clear Chat"):
+        st.session_state.messages = []
+        # Reset email conversation if it exists
+        if "email_conversation" in st.session_state:
+            st.session_state.email_conversation = create_initial_messages()
+            email_assistant.messages = st.session_state.email_conversation
+        # Re-add welcome message after clearing
+        add_ai_message("How can I help you?")
+        st.rerun(scope="app")
+
+
+render_sidebar()
+
+# The fragment records its widget state in session state for the main body
+selected_agent = st.session_state.selected_agent
+force_refresh = st.session_state.get("force_refresh", False)
 
 # Display the chat interface
 display_chat_history()
 
 # Handle new user input
 if prompt := st.chat_input("Type your message here..."):
-    # Add user message to chat history
+    # Add user message to chat history and draw its bubble in this same run,
+    # then fall through to the AI handler below. Calling st.rerun() here
+    # cost a full redundant script pass before inference even started.
     add_human_message(prompt)
-    
-    # Display the updated chat with the new user message
-    st.rerun()
+    st.session_state.pending_prompt = prompt
+    with st.chat_message("user"):
+        st.write(prompt)
 
-if st.session_state.messages and st.session_state.messages[-1]["type"] == MESSAGE_TYPE_HUMAN:
-    user_prompt = st.session_state.messages[-1]["content"]
+# The pending_prompt flag is set only at submit time and cleared before the
+# agent call, so a stray rerun (sidebar click, fragment interaction) while
+# the last message is human cannot re-trigger an expensive Bedrock call.
+if st.session_state.get("pending_prompt"):
+    user_prompt = st.session_state.pop("pending_prompt")
     
     # Process the AI's response
     with st.chat_message("assistant"):
@@ -216,59 +281,86 @@ if st.session_state.messages and st.session_state.messages[-1]["type"] == MESSAG
             response_container = st.container()
             
             with response_container:
-                # Show loading spinner while processing
-                with st.spinner("Thinking..."):
-                    # Process the user's message
-                    s3_info, img_response, retrieve_response, agent_response, email_agent_response, metrics = call_agent(user_prompt, selected_agent)
-                    
                 if selected_agent == "Email assistant agent":
+                    # Stream the reply token by token: time-to-first-token
+                    # drops to model latency and the full email is not
+                    # buffered before anything appears on screen
+                    s3_info = img_response = retrieve_response = agent_response = metrics = None
+                    stream_slot = st.empty()
+                    # While streaming, show the accumulated reply as plain
+                    # text: one cheap element update per delta instead of a
+                    # full markdown tokenization pass on every chunk. The
+                    # markdown render happens exactly once, at stream end.
+                    chunks = []
+                    for delta in call_agent_stream(user_prompt):
+                        chunks.append(delta)
+                        stream_slot.text("".join(chunks))
+                    email_text = "".join(chunks)
 
-                    email_response = email_agent_response.message
-
-                    if email_response and "content" in email_response and len(email_response["content"]) > 0:
-                        if isinstance(email_response["content"][0], dict) and "text" in email_response["content"][0]:
-                            email_text = email_response["content"][0]["text"]
-                                   
-                            # Clean the response text to remove thinking tags
-                            clean_email_text = extract_text_after_thinking(email_text)
-                              
-                            # Create a pattern that matches both markdown images and direct image paths
-                            pattern = r'(!\[(.*?)\]\((generated_images.+?\.png)\))|(generated_images\S+\.png)'
-                            
-                            # Find all matches (both markdown images and direct paths)
-                            matches = re.finditer(pattern, clean_email_text)
-                            
-                            # If no matches, just display the text
-                            if not re.search(pattern, clean_email_text):
-                                st.markdown(clean_email_text, unsafe_allow_html=True)
-                            else:
-                                # Split the text by all image references and process each part
-                                last_end = 0
-                                for match in matches:
-                                    # Display text before the image
-                                    if match.start() > last_end:
-                                        st.markdown(clean_email_text[last_end:match.start()], unsafe_allow_html=True)
-                                    
-                                    # Determine the image path
-                                    if match.group(1):  # Markdown image
-                                        image_path = match.group(3)
-                                    else:  # Direct path
-                                        image_path = match.group(0)
-                                    
-                                    # Display the image if it exists
-                                    if os.path.exists(image_path):
-                                        img = PILImage.open(image_path)
-                                        st.image(img, width=400)
-                                    
-                                    # Update the last position
-                                    last_end = match.end()
-                                
-                                # Display any remaining text after the last image
-                                if last_end < len(clean_email_text):
-                                    st.markdown(clean_email_text[last_end:], unsafe_allow_html=True)
+                    # Clean the response text to remove thinking tags
+                    clean_email_text = extract_text_after_thinking(email_text)
+
+                    # Find all matches (both markdown images and direct
+                    # paths) in a single scan of the text
+                    matches = list(IMG_REF_RE.finditer(clean_email_text))
+
+                    # Swap the plain-text stream for the final markdown
+                    stream_slot.empty()
+                    with stream_slot.container():
+                        if not matches:
+                            st.markdown(clean_email_text, unsafe_allow_html=True)
+                        else:
+                            # Splice text and inline images into one HTML
+                            # block: a single st.markdown is one element
+                            # and one websocket message, instead of an
+                            # alternating run of markdown/image widgets
+                            parts = []
+                            last_end = 0
+                            for match in matches:
+                                # Collect text before the image
+                                if match.start() > last_end:
+                                    parts.append(clean_email_text[last_end:match.start()])
+
+                                # Determine the image path
+                                if match.group(1):  # Markdown image
+                                    image_path = match.group(3)
+                                else:  # Direct path
+                                    image_path = match.group(0)
+
+                                # Inline the image as a data URI if it
+                                # exists (img_to_bytes caches the encode)
+                                if os.path.exists(image_path):
+                                    parts.append(img_to_html(image_path))
+
+                                # Update the last position
+                                last_end = match.end()
+
+                            # Collect any remaining text after the last image
+                            if last_end < len(clean_email_text):
+                                parts.append(clean_email_text[last_end:])
+
+                            st.markdown("".join(parts), unsafe_allow_html=True)
+
+                else:
+                    # Run the multi-second Bedrock invocation on a worker
+                    # thread so the script thread stays free to paint the
+                    # spinner instead of sitting blocked in the agent call
+                    with st.spinner("Thinking..."):
+                        ctx = get_script_run_ctx()
+
+                        def _invoke():
+                            # The worker needs this session's script-run
+                            # context to read/write st.session_state
+                            add_script_run_ctx(threading.current_thread(), ctx)
+                            return call_agent_cached(user_prompt, selected_agent, bypass=force_refresh)
+
+                        future = get_agent_executor().submit(_invoke)
+                        while not future.done():
+                            time.sleep(0.1)
+                        s3_info, img_response, retrieve_response, agent_response, email_agent_response, metrics = future.result()
 
                 # Handle image response
-                elif (img_response and selected_agent == "Image agent"):
+                if (img_response and selected_agent == "Image agent"):
 
                     # st.write("img_response")
                     # st.write(img_response)
@@ -285,8 +377,17 @@ if st.session_state.messages and st.session_state.messages[-1]["type"] == MESSAG
                     with st.container():
                         st.write(txt_msg)
                     
-                    # First try to extract tool output from metrics
-                    tool_output = extract_tool_output_from_metrics(img_response)
+                    # First try to extract tool output from metrics.
+                    # Memoized per turn in session state: img_response for a
+                    # given turn never changes, so reruns reuse the extracted
+                    # value instead of re-walking the nested metrics dict.
+                    tool_cache = st.session_state.setdefault("tool_output_cache", {})
+                    turn_key = len(st.session_state.messages)
+                    if turn_key in tool_cache:
+                        tool_output = tool_cache[turn_key]
+                    else:
+                        tool_output = extract_tool_output_from_metrics(img_response)
+                        tool_cache[turn_key] = tool_output
                     
                     image_displayed = False
                     image_path = None
@@ -372,15 +473,7 @@ if st.session_state.messages and st.session_state.messages[-1]["type"] == MESSAG
                             # Streamlit native audio player
                             try:
                                 st.subheader("Play audio file")
-                                s3_client = boto3.client('s3')
-                                url = s3_client.generate_presigned_url(
-                                    'get_object',
-                                    Params={
-                                        'Bucket': s3_info['bucket'],
-                                        'Key': s3_info['key']
-                                    },
-                                    ExpiresIn=3600
-                                )
+                                url = presign_s3_url(s3_info['bucket'], s3_info['key'])
         
                                 st.audio(url)
         
@@ -395,18 +488,19 @@ if st.session_state.messages and st.session_state.messages[-1]["type"] == MESSAG
                                 st.error(f"Error with fallback player: {str(e)}")
                                 st.exception(e)
                 
-                # Display expanders if we have responses
-                with st.expander("Retrieved Details", expanded=False):
-                    if retrieve_response is not None and retrieve_response != "":
-                        st.write(retrieve_response)
-    
-                with st.expander("Agent Response Details", expanded=False):
-                    if agent_response is not None and agent_response != "":
-                        st.write(agent_response)
-    
-                with st.expander("Metrics", expanded=False):
-                    if metrics is not None and metrics != "":
-                        st.write(metrics)
+                # Display expanders if we have responses and debug is on
+                if st.session_state.get("debug_mode"):
+                    with st.expander("Retrieved Details", expanded=False):
+                        if retrieve_response is not None and retrieve_response != "":
+                            st.write(retrieve_response)
+
+                    with st.expander("Agent Response Details", expanded=False):
+                        if agent_response is not None and agent_response != "":
+                            st.write(agent_response)
+
+                    with st.expander("Metrics", expanded=False):
+                        if metrics is not None and metrics != "":
+                            st.write(metrics)
                
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
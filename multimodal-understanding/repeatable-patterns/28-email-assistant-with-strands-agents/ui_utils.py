@@ -1,12 +1,19 @@
 import streamlit as st
 from datetime import datetime
+import asyncio
+import copy
 import sys
 import os
 import uuid
 import boto3
+import hashlib
 import json
-import re
+import random
+import threading
 import time
+import types
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 import base64
 from PIL import Image as PILImage 
@@ -14,6 +21,17 @@ import io
 
 from typing import Any, Dict
 
+# google-re2 is optional: it compiles to a linear-time DFA, so scanning the
+# multi-KB retrieval payloads never backtracks. The stdlib engine is the
+# fallback when it is not installed.
+try:
+    import re2 as _regex
+except ImportError:
+    import re as _regex
+
+# Single pass pulls bucket and key together out of a metadata object
+_S3_META_RE = _regex.compile(r'"s3_bucket":\s*"([^"]+)"[^}]*"s3_key":\s*"([^"]+)"')
+
 # Add the src directory to the path
 from generate_img_streamlit import generate_img_streamlit
 from strands import Agent, tool
@@ -32,30 +50,30 @@ MESSAGE_TYPE_AI = "ai"
 MESSAGE_TYPE_TOOL = "tool"
 MESSAGE_TYPE_SYSTEM = "system"
 
+# Immutable stand-in for "no metadata"; safe to share between messages
+_EMPTY_META = types.MappingProxyType({})
+
+_THINKING_END = '</thinking>'
+
 def extract_text_after_thinking(text):
     """
     Extract only the text that appears after the </thinking> tag.
     If no </thinking> tag is found, return the original text.
-    
+
     Args:
         text (str): The text that may contain thinking tags
-        
+
     Returns:
         str: The text after the last </thinking> tag, or the original text if no tag is found
     """
-    if not text:
-        return text
-        
-    # Find the position of the last </thinking> tag
-    last_thinking_end = text.rfind('</thinking>')
-    
-    if last_thinking_end != -1:
-        # Return everything after the last </thinking> tag
-        return text[last_thinking_end + len('</thinking>'):].strip()
-    else:
-        # If no </thinking> tag is found, return the original text
+    # Fast path: most replies carry no thinking block at all, so return the
+    # original string untouched instead of slicing and re-stripping it
+    if not text or _THINKING_END not in text:
         return text
 
+    # Return everything after the last </thinking> tag
+    return text[text.rindex(_THINKING_END) + len(_THINKING_END):].strip()
+
 def initialize_email_assistant():
     """Initialize the email assistant with conversation history if needed"""
     if "email_conversation" not in st.session_state:
@@ -72,26 +90,26 @@ def add_message_to_history(message_type, content, metadata=None):
         metadata (dict, optional): Additional metadata like image paths, etc.
     """
     if metadata is None:
-        metadata = {}
-    
-    # Create a timestamp for ordering
+        # Shared read-only mapping: most messages carry no metadata, so
+        # skip allocating a throwaway dict per call
+        metadata = _EMPTY_META
+
+    # Create a timestamp for ordering; the display string is formatted
+    # directly, which is far cheaper than strftime
     timestamp = datetime.now()
-    
+
     # Create the message object
     message = {
         "type": message_type,
         "content": content,
         "timestamp": timestamp,
-        "display_time": timestamp.strftime("%H:%M"),
+        "display_time": f"{timestamp.hour:02d}:{timestamp.minute:02d}",
         "metadata": metadata
     }
-    
+
     # Add to session state
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-    
-    st.session_state.messages.append(message)
-    
+    st.session_state.setdefault("messages", []).append(message)
+
     return message
 
 def add_human_message(content):
@@ -118,30 +136,6 @@ def add_system_message(content):
     """Add a system message to the conversation history"""
     return add_message_to_history(MESSAGE_TYPE_SYSTEM, content)
 
-def extract_text_after_thinking(text):
-    """
-    Extract only the text that appears after the </thinking> tag.
-    If no </thinking> tag is found, return the original text.
-    
-    Args:
-        text (str): The text that may contain thinking tags
-        
-    Returns:
-        str: The text after the last </thinking> tag, or the original text if no tag is found
-    """
-    if not text:
-        return text
-        
-    # Find the position of the last </thinking> tag
-    last_thinking_end = text.rfind('</thinking>')
-    
-    if last_thinking_end != -1:
-        # Return everything after the last </thinking> tag
-        return text[last_thinking_end + len('</thinking>'):].strip()
-    else:
-        # If no </thinking> tag is found, return the original text
-        return text
-
 def extract_tool_output_from_metrics(response):
     """
     Extract tool output from the metrics in the response or from the response text
@@ -153,70 +147,87 @@ def extract_tool_output_from_metrics(response):
         dict or None: The tool output if found, None otherwise
     """
     try:
-        # First try to extract from metrics
-        if "metrics" in response:
-            # Parse metrics if it's a string
-            metrics = response["metrics"]
-            if isinstance(metrics, str):
+        # First try to extract from metrics; .get chains cost one hash
+        # lookup per key where the old "x" in d / d["x"] pairs cost two
+        metrics = response.get("metrics") if isinstance(response, dict) else None
+        if metrics:
+            # Metrics usually arrive as a dict already; only fall back to a
+            # full JSON parse for serialized blobs
+            if isinstance(metrics, (bytes, str)):
                 metrics = json.loads(metrics)
-            
+
             # Look for generate_img_streamlit tool metrics
-            if "tool_metrics" in metrics and "generate_img_streamlit" in metrics["tool_metrics"]:
-                tool_metric = metrics["tool_metrics"]["generate_img_streamlit"]
-                
+            tool_metric = (metrics.get("tool_metrics") or {}).get("generate_img_streamlit")
+            if tool_metric:
                 # The tool might store output in its response
-                if "tool" in tool_metric and "content" in tool_metric["tool"]:
-                    content = tool_metric["tool"]["content"]
-                    if isinstance(content, list) and len(content) > 0 and "text" in content[0]:
-                        text = content[0]["text"]
+                content = (tool_metric.get("tool") or {}).get("content") or []
+                if isinstance(content, list) and content and isinstance(content[0], dict):
+                    text = content[0].get("text")
+                    if text is not None:
                         info = extract_info_from_tool_response(text)
                         if "image_path" in info:
                             return {"file_path": info["image_path"]}
-        
+
         # If we couldn't extract from metrics, try to extract from the response text
-        if "message" in response and "content" in response["message"]:
-            content = response["message"]["content"]
-            if content and isinstance(content[0], dict) and "text" in content[0]:
-                text = content[0]["text"]
+        message = response.get("message") if isinstance(response, dict) else None
+        content = message.get("content") if message else None
+        if content and isinstance(content[0], dict):
+            text = content[0].get("text")
+            if text is not None:
                 info = extract_info_from_tool_response(text)
                 if "image_path" in info:
                     return {"file_path": info["image_path"]}
-        
+
         return None
     except Exception as e:
         print(f"Error extracting tool output: {str(e)}")
         return None
 
         
+# Short TTL: the listdir + per-file getctime walk grows with every saved
+# image, and most reruns happen with no new file, so reuse the last answer
+# for a couple of seconds.
+_IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
+@st.cache_data(ttl=2, show_spinner=False)
 def find_most_recent_image():
     """
     Find the most recently created image in the SAVE_DIR
-    
+
     Returns:
         str or None: Path to the most recent image, or None if no images found
     """
     try:
-        SAVE_DIR = "generated_images"  # Make sure this matches your tool's SAVE_DIR
-        
+        # Single scandir pass tracking the running max: one stat per entry
+        # (served from the directory read) instead of a sort whose key re-ran
+        # os.path.getctime per comparison
+        best = None
+        best_ctime = -1.0
         if os.path.exists(SAVE_DIR):
-            image_files = [f for f in os.listdir(SAVE_DIR) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-            
-            if image_files:
-                # Sort by creation time, newest first
-                image_files.sort(key=lambda x: os.path.getctime(os.path.join(SAVE_DIR, x)), reverse=True)
-                newest_image = os.path.join(SAVE_DIR, image_files[0])
-                
-                # Check if the file was created in the last minute
-                if time.time() - os.path.getctime(newest_image) < 60:
-                    return newest_image
-        
+            with os.scandir(SAVE_DIR) as entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith(_IMAGE_EXTS):
+                        continue
+                    ctime = entry.stat().st_ctime
+                    if ctime > best_ctime:
+                        best_ctime = ctime
+                        best = entry.path
+
+        # Check if the file was created in the last minute
+        if best is not None and time.time() - best_ctime < 60:
+            return best
+
         return None
     except Exception as e:
         print(f"Error finding recent images: {str(e)}")
         return None
         
 
-def create_initial_messages():
+# The seed conversation never changes, so build it once per process and hand
+# out deep copies: resets then cost a copy instead of re-building the
+# structure, and callers remain free to mutate their conversation.
+@st.cache_resource
+def _initial_messages_template():
     return [{
         "role": "user",
         "content": [{"text": "Hello, I need help writing an email."}]
@@ -226,72 +237,107 @@ def create_initial_messages():
     }]
 
 
-# Create Image generation agent
-image_agent_instance = Agent(
-    system_prompt= """You are an AI assistant that can generate images and save them to files.
+def create_initial_messages():
+    return copy.deepcopy(_initial_messages_template())
+
+
+# Latency-optimized inference cuts Nova Pro's time-to-first-token at no
+# accuracy cost, but is only offered in a few regions; elsewhere the model
+# runs in standard mode.
+_LATENCY_OPT_REGIONS = ("us-east-1", "us-east-2", "us-west-2")
+
+# Adaptive retry mode rate-limits client-side with jittered backoff instead
+# of letting throttles surface immediately; keep-alive reuses the TLS
+# connection between turns.
+_BEDROCK_CLIENT_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=120,
+    tcp_keepalive=True
+)
+
+def _nova_pro_model():
+    kwargs = {}
+    if region_name in _LATENCY_OPT_REGIONS:
+        kwargs["additional_request_fields"] = {"performanceConfig": {"latency": "optimized"}}
+    return BedrockModel(
+        model_id="us.amazon.nova-pro-v1:0",
+        region=region_name,
+        boto_client_config=_BEDROCK_CLIENT_CONFIG,
+        **kwargs
+    )
+
+
+# Create Image generation agent. st.cache_resource pins exactly one
+# instance per process even if Streamlit re-imports this module, so the
+# tool-schema introspection and client setup never repeat on a reload.
+@st.cache_resource
+def get_image_agent():
+    return Agent(
+        system_prompt= """You are an AI assistant that can generate images and save them to files.
     You can:
     1. Generate images using the generate_img_streamlit tool
     2. Save files using the generate_img_streamlit tool
-    
+
     When users want to:
     - Generate an image: Use generate_img_streamlit
     - Save the generated image: Use file_write to save it
     - Both: First generate, then save the image
-    
+
     Always confirm actions and provide clear feedback about what was done.""",
-    tools=[generate_img_streamlit]
-)            
+        tools=[generate_img_streamlit]
+    )
+
+image_agent_instance = get_image_agent()
 
 @tool
 def handle_img_generation_request(user_message):
     return image_agent_instance(user_message)
 
+_RAG_SYSTEM_PROMPT = """You are a knowledgeable AI assistant. Analyze the retrieved information and provide comprehensive answers.
+        Focus on accuracy and clarity in your responses."""
+
+# Built once at import like image_agent_instance and email_assistant: Agent
+# construction introspects tool schemas and binds the Bedrock model, which
+# is wasted work per query. Per-call state goes in .messages under a lock so
+# concurrent sessions can't interleave conversations.
+_rag_agent = Agent(model=_nova_pro_model(), tools=[retrieve, think])
+_rag_agent_lock = threading.Lock()
+
+
 @tool
 def handle_RAG_request(user_query):
 
-    # Create agent with Nova Pro model configuration
-    agent_config = {
-        "system_prompt": """You are a knowledgeable AI assistant. Analyze the retrieved information and provide comprehensive answers.
-        Focus on accuracy and clarity in your responses.""",
-        "model": BedrockModel(
-            model_id="us.amazon.nova-pro-v1:0",
-            region=region_name
-        ),
-        "tools": [retrieve, think]
-    }
-            
     try:
         # Direct call to retrieve.retrieve method
         retrieve_tool_response = retrieve.retrieve({
-            "toolUseId": str(uuid.uuid4()),
+            "toolUseId": uuid.uuid4().hex,
             "input": {
                 "text": user_query,
                 "score": 0.4,
                 "numberOfResults": 5
             }
         })
-        
+
         retrieve_response = retrieve_tool_response
-    
+
         if retrieve_tool_response["status"] == "success":
-            
+
             retrieved_text = retrieve_tool_response["content"][0]["text"]
-            
+
             # Extract just the S3 information
             s3_info = extract_s3_info(retrieved_text)
-            
-            # Create and invoke agent with the messages
-            RAG_agent = Agent(
-                messages=[{
+
+            # Reuse the module-level agent, resetting its conversation to
+            # this query's retrieved context
+            with _rag_agent_lock:
+                _rag_agent.messages = [{
                     "role": "user",
-                    "content": [{"text": agent_config["system_prompt"]+f"""Here is the retrieved information:{retrieved_text}, Please analyze this information and provide insights about: {user_query}"""}]
-                }],
-                model=agent_config["model"],
-                tools=agent_config["tools"]
-            )
-            
-            # Get agent response
-            agent_response = RAG_agent(user_query)                
+                    "content": [{"text": _RAG_SYSTEM_PROMPT+f"""Here is the retrieved information:{retrieved_text}, Please analyze this information and provide insights about: {user_query}"""}]
+                }]
+
+                # Get agent response
+                agent_response = _rag_agent(user_query)
         else:
             add_system_message("No relevant information found in the knowledge base.")
 
@@ -307,9 +353,14 @@ def handle_RAG_request(user_query):
 
 
 
-# Create the email assistant agent with Nova Pro model
-email_assistant = Agent(
-    system_prompt="""You are a professional email writing assistant that can leverage audio RAG and image generation capabilities. 
+# Create the email assistant agent with Nova Pro model. Cached as a
+# process-wide resource for the same reason as the image agent; its
+# .messages are swapped per session from st.session_state.email_conversation
+# rather than mutated as shared state.
+@st.cache_resource
+def get_email_assistant():
+    return Agent(
+        system_prompt="""You are a professional email writing assistant that can leverage audio RAG and image generation capabilities.
     You have access to two main tools:
 
     IMPORTANT: Only generate and add an image if you asked to do so.
@@ -344,140 +395,325 @@ email_assistant = Agent(
     - Format email with proper structure
     - Include references to multimedia content
     - Ensure professional tone and accuracy""",
-    model=BedrockModel(
-        model_id="us.amazon.nova-pro-v1:0",
-        region=region_name
-    ),
-    tools=[
-        editor, 
-     #   http_request, 
-        handle_RAG_request,  # Your existing RAG agent
-        handle_img_generation_request     # Your existing image generation agent
-        #web_researcher
-    ]
-)
+        model=_nova_pro_model(),
+        tools=[
+            editor,
+         #   http_request,
+            handle_RAG_request,  # Your existing RAG agent
+            handle_img_generation_request     # Your existing image generation agent
+            #web_researcher
+        ]
+    )
+
+email_assistant = get_email_assistant()
 
 # Initialize messages
 email_assistant.messages = create_initial_messages()
     
+# Delimiter the batched RAG prompt asks the model to place between answers
+_BATCH_SEP = "<<<SEP>>>"
+
+def handle_RAG_requests_batch(user_queries):
+    """
+    Answer several retrieval questions with a single model invocation.
+
+    Each query still runs its own knowledge-base retrieval, but the
+    expensive Nova Pro analysis call is amortized: questions and their
+    retrieved contexts are packed into one numbered prompt and the reply is
+    split back per question, so N questions cost one Bedrock round trip
+    instead of N.
+
+    Args:
+        user_queries (list[str]): Retrieval questions to answer together
+
+    Returns:
+        list[dict]: One entry per query with 'query', 'answer' and
+            'retrieve_response' keys
+    """
+    if not user_queries:
+        return []
+
+    sections = []
+    retrievals = []
+    for idx, user_query in enumerate(user_queries, 1):
+        retrieve_tool_response = retrieve.retrieve({
+            "toolUseId": uuid.uuid4().hex,
+            "input": {
+                "text": user_query,
+                "score": 0.4,
+                "numberOfResults": 5
+            }
+        })
+        retrievals.append(retrieve_tool_response)
+
+        retrieved_text = ""
+        if retrieve_tool_response["status"] == "success":
+            retrieved_text = retrieve_tool_response["content"][0]["text"]
+        sections.append(f"Question {idx}: {user_query}\nContext {idx}: {retrieved_text}")
+
+    prompt = (
+        "Answer each numbered question using only its matching context. "
+        f"Separate consecutive answers with the literal delimiter {_BATCH_SEP} "
+        "and output nothing else.\n\n"
+        + "\n\n".join(sections)
+    )
+
+    batch_agent = Agent(model=_nova_pro_model())
+    agent_response = batch_agent(prompt)
+
+    text = agent_response.message["content"][0]["text"]
+    answers = [answer.strip() for answer in text.split(_BATCH_SEP)]
+    # Pad in case the model dropped a delimiter
+    answers += [""] * (len(user_queries) - len(answers))
+
+    return [
+        {"query": q, "answer": a, "retrieve_response": r}
+        for q, a, r in zip(user_queries, answers, retrievals)
+    ]
+
+
+def _extract_metrics(response):
+    """Return the response's metrics field when present, else None."""
+    if isinstance(response, dict):
+        return response.get("metrics")
+    return None
+
+
+def _run_email(query):
+    """Run one email-assistant turn; see call_agent for the return shape."""
+    email_agent_response = None
+    metrics_data = None
+
+    try:
+        # Create the user message with proper Nova format
+        user_message = {
+            "role": "user",
+            "content": [{"text": query}]
+        }
+
+        # Add message to conversation
+        email_assistant.messages.append(user_message)
+
+        # Get response
+        email_agent_response = email_assistant(query)
+        print(f"\nEmail Generated:\n{email_agent_response}\n")
+
+        # Store metrics for the expander
+        metrics_data = _extract_metrics(email_agent_response)
+
+        email_response = email_agent_response.message
+
+        if email_response and "content" in email_response and len(email_response["content"]) > 0:
+            if isinstance(email_response["content"][0], dict) and "text" in email_response["content"][0]:
+                # Clean the response text to remove thinking tags
+                ai_response_text = extract_text_after_thinking(email_response["content"][0]["text"])
+
+                # Update the conversation history
+                email_assistant.messages.append({
+                    "role": "assistant",
+                    "content": [{"text": ai_response_text}]
+                })
+
+                # Add to the UI message history
+                add_ai_message(ai_response_text)
+            else:
+                add_system_message(f"Unexpected response format: {email_agent_response}")
+
+    except Exception as e:
+        error_msg = f"Error email agent: {str(e)}\n"
+        print(error_msg)
+        add_system_message(error_msg)
+
+    return None, None, None, None, email_agent_response, metrics_data
+
+
+def _run_image(query):
+    """Run the image agent; see call_agent for the return shape."""
+    img_response = None
+    metrics_data = None
+
+    try:
+        img_response = handle_img_generation_request(query)
+
+        # Store metrics for the expander
+        metrics_data = _extract_metrics(img_response)
+
+    except Exception as e:
+        error_msg = f"Error with Image Agent: {str(e)}"
+        print(error_msg)
+        add_system_message(error_msg)
+
+    # agent_response mirrors img_response for the debug expander
+    return None, img_response, None, img_response, None, metrics_data
+
+
+def _run_rag(query):
+    """Run the Audio RAG agent; see call_agent for the return shape."""
+    retrieve_response, agent_response, s3_info = handle_RAG_request(query)
+
+    # Store metrics for the expander
+    metrics_data = _extract_metrics(agent_response)
+
+    if isinstance(agent_response, dict) and "message" in agent_response:
+        ai_response_text = agent_response["message"]["content"][0]["text"]
+
+        # Add tool message for retrieval
+        if isinstance(retrieve_response, dict) and "content" in retrieve_response:
+            result_note = f"Found {len(retrieve_response['content'])} relevant documents"
+        else:
+            result_note = "Retrieval completed"
+        add_tool_message(
+            "Knowledge Retrieval",
+            f"Retrieved information related to: '{query}'",
+            result_note
+        )
+        add_ai_message(ai_response_text)
+    else:
+        # Don't display error message to user when switching agents
+        print(f"Debug: Unexpected response format: {agent_response}")
+
+    return s3_info, None, retrieve_response, agent_response, None, metrics_data
+
+
+# O(1) handler lookup instead of an if/elif chain over agent names
+_AGENT_HANDLERS = {
+    'Email assistant agent': _run_email,
+    'Image agent': _run_image,
+    'Audio RAG': _run_rag,
+}
+
+
 def call_agent(query, selected_agent):
     """
     Process user query using the selected agent
-    
+
     Returns:
-        tuple: (s3_info, img_response, retrieve_response, agent_response, metrics_data)
+        tuple: (s3_info, img_response, retrieve_response, agent_response, email_agent_response, metrics_data)
             - s3_info: S3 bucket and key information if available
             - img_response: Image generation response if available
             - retrieve_response: Knowledge retrieval response if available
             - agent_response: The main agent response (RAG, Image, or Email)
+            - email_agent_response: The email assistant response if available
             - metrics_data: Metrics data for debugging
     """
-    s3_info = None
-    img_response = None
-    retrieve_response = None
-    agent_response = None
-    metrics_data = None
-    email_agent_response = None
+    handler = _AGENT_HANDLERS.get(selected_agent)
+    if handler is None:
+        add_system_message(f"Agent '{selected_agent}' not recognized.")
+        return None, None, None, None, None, None
+    return _invoke_with_backoff(handler, query)
 
-    # Handle Email Assistant Agent
-    if selected_agent == 'Email assistant agent':
-        
+
+def _invoke_with_backoff(handler, query, attempts=5):
+    """
+    Retry a throttled agent invocation with exponential backoff plus jitter.
+
+    The SDK's adaptive retry mode already backs off inside a call; this
+    outer loop covers the case where the whole invocation still comes back
+    throttled, telling the user it is retrying instead of surfacing a raw
+    stack trace they would answer with an immediate (compounding) resubmit.
+    """
+    for attempt in range(attempts):
         try:
-            # Create the user message with proper Nova format
-            user_message = {
-                "role": "user",
-                "content": [{"text": query}]
-            }
+            return handler(query)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            if code not in ("ThrottlingException", "TooManyRequestsException") \
+                    or attempt == attempts - 1:
+                raise
+            delay = min(2 ** attempt + random.random(), 30)
+            add_system_message(
+                f"Temporarily rate-limited by Bedrock, retrying in {delay:.0f}s"
+            )
+            time.sleep(delay)
 
-            # Add message to conversation
-            email_assistant.messages.append(user_message)
+def call_agent_stream(query):
+    """
+    Stream the email assistant's reply as text deltas.
 
-            #st.write(user_message)
-            #st.write(handle_RAG_request)
-            
-            # Get response
-            email_agent_response = email_assistant(user_message["content"][0]["text"])
-            print(f"\nEmail Generated:\n{email_agent_response}\n")
-
-            # Store metrics for the expander
-            if isinstance(email_agent_response, dict) and "metrics" in email_agent_response:
-                metrics_data = email_agent_response["metrics"]
-
-            # Print response
-
-            email_response = email_agent_response.message
-                   
-            if email_response and "content" in email_response and len(email_response["content"]) > 0:
-                if isinstance(email_response["content"][0], dict) and "text" in email_response["content"][0]:
-                    ai_response_text = email_response["content"][0]["text"]
-
-                    # Clean the response text to remove thinking tags
-                    ai_response_text = extract_text_after_thinking(ai_response_text)
-
-                    # Add the assistant's response to the conversation history
-                    assistant_message = {
-                        "role": "assistant",
-                        "content": [{"text": ai_response_text}]
-                    }
-                    # Update the conversation history
-                    email_assistant.messages.append(assistant_message)
-                
-                    # Add to the UI message history
-                    add_ai_message(ai_response_text)
-                else:
-                    add_system_message(f"Unexpected response format: {email_agent_response}")
-
-        except Exception as e:
-            error_msg = f"Error email agent: {str(e)}\n"
-            print(error_msg)
-            add_system_message(error_msg)
-
-
-    # Handle Image Agent
-    elif selected_agent == 'Image agent':
+    Yields chunks as Bedrock produces them, so the UI shows the first tokens
+    at model latency instead of blocking until the whole email is generated.
+    Once the stream completes, the conversation history and UI transcript are
+    updated exactly as the blocking path does.
+    """
+    user_message = {
+        "role": "user",
+        "content": [{"text": query}]
+    }
+    email_assistant.messages.append(user_message)
+
+    chunks = []
+    try:
+        # stream_async is an async generator; drive it step by step on a
+        # private event loop so callers can consume a plain sync generator
+        agen = email_assistant.stream_async(query)
+        loop = asyncio.new_event_loop()
         try:
-            img_response = handle_img_generation_request(query)
-            agent_response = img_response  # Set agent_response to img_response
+            while True:
+                try:
+                    event = loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+                data = event.get("data") if isinstance(event, dict) else None
+                if data:
+                    chunks.append(data)
+                    yield data
+        finally:
+            loop.close()
+    except Exception as e:
+        error_msg = f"Error email agent: {str(e)}\n"
+        print(error_msg)
+        add_system_message(error_msg)
+        return
 
-            # Store metrics for the expander
-            if isinstance(img_response, dict) and "metrics" in img_response:
-                metrics_data = img_response["metrics"]
-                           
-        except Exception as e:
-            error_msg = f"Error with Image Agent: {str(e)}"
-            print(error_msg)
-            add_system_message(error_msg)
+    # Clean the response text to remove thinking tags
+    ai_response_text = extract_text_after_thinking("".join(chunks))
 
+    # Update the conversation history
+    email_assistant.messages.append({
+        "role": "assistant",
+        "content": [{"text": ai_response_text}]
+    })
 
-    # Handle Audio RAG Agent
-    elif selected_agent == 'Audio RAG':  
-        
-        retrieve_response, agent_response, s3_info = handle_RAG_request(query)
-    
-        # Store metrics for the expander
-        if isinstance(agent_response, dict) and "metrics" in agent_response:
-            metrics_data = agent_response["metrics"]
-
-        # Print response
-        if isinstance(agent_response, dict) and "message" in agent_response:
-            ai_response_text = agent_response["message"]["content"][0]["text"]
-           
-            # Add tool message for retrieval
-            add_tool_message(
-                "Knowledge Retrieval", 
-                f"Retrieved information related to: '{user_query}'",
-                f"Found {len(retrieve_tool_response['content'])} relevant documents"
-            )
-            add_ai_message(ai_response_text)
-        else:
-            # Don't display error message to user when switching agents
-            print(f"Debug: Unexpected response format: {agent_response}")
-            
-    # Default case if agent not recognized
-    else:
-        add_system_message(f"Agent '{selected_agent}' not recognized.")
-        
-    return s3_info, img_response, retrieve_response, agent_response, email_agent_response, metrics_data
+    # Add to the UI message history
+    add_ai_message(ai_response_text)
+
+
+# How long an identical (agent, query) response is reused before re-invoking
+# Bedrock. The cache lives in session state rather than st.cache_data because
+# agent responses hold non-picklable objects.
+_AGENT_CACHE_TTL = 600
+
+def call_agent_cached(query, selected_agent, bypass=False):
+    """
+    TTL-cached front end for call_agent: repeating the same query on the same
+    agent (re-click, reload) reuses the previous response instead of paying a
+    full Bedrock round trip. History entries appended by the original call are
+    replayed on a hit so the chat transcript still grows normally.
+
+    The email assistant is deliberately not cached: its conversation state
+    means the same prompt can legitimately produce a different reply.
+    """
+    if bypass or selected_agent == 'Email assistant agent':
+        return call_agent(query, selected_agent)
+
+    cache = st.session_state.setdefault("agent_call_cache", {})
+    # Hash the query so cache keys stay small regardless of prompt length
+    key = (selected_agent, hashlib.sha1(query.encode()).hexdigest())
+    hit = cache.get(key)
+    if hit is not None:
+        cached_at, result, replay = hit
+        if time.time() - cached_at < _AGENT_CACHE_TTL:
+            for message in replay:
+                add_message_to_history(
+                    message["type"], message["content"], dict(message["metadata"])
+                )
+            return result
+        del cache[key]
+
+    before = len(st.session_state.get("messages", []))
+    result = call_agent(query, selected_agent)
+    cache[key] = (time.time(), result, list(st.session_state.messages[before:]))
+    return result
 
 def extract_info_from_tool_response(response_text):
     """
@@ -490,20 +726,28 @@ def extract_info_from_tool_response(response_text):
         dict: Dictionary with extracted information
     """
     result = {}
-    
-    # Extract image path
-    image_match = re.search(r"Image (?:saved to|path): (.+\.png)", response_text)
-    if image_match:
-        result["image_path"] = image_match.group(1)
-    
+
+    # Extract image path. The markers are fixed literals, so substring
+    # slicing does the job without invoking the regex engine on every
+    # tool response.
+    for needle in ("Image saved to: ", "Image path: "):
+        _, sep, rest = response_text.partition(needle)
+        if sep:
+            line = rest.split("\n", 1)[0].rstrip()
+            if line.endswith(".png"):
+                result["image_path"] = line
+                break
+
     # Extract S3 info
-    s3_match = re.search(r"Audio source: Bucket: ([^,]+), Key: (.+)", response_text)
-    if s3_match:
-        result["s3_info"] = {
-            "bucket": s3_match.group(1),
-            "key": s3_match.group(2)
-        }
-    
+    _, sep, rest = response_text.partition("Audio source: Bucket: ")
+    if sep:
+        bucket, sep, rest = rest.partition(", Key: ")
+        if sep:
+            result["s3_info"] = {
+                "bucket": bucket,
+                "key": rest.split("\n", 1)[0].rstrip()
+            }
+
     return result
 
 def clean_email_conversation():
@@ -522,34 +766,55 @@ def clean_email_conversation():
     ]
 
 
+def _find_json_str_value(text, key, start=0):
+    """
+    Return (value, end_index) for the first '"key": "value"' pair at or after
+    start, or (None, -1) when absent. A few str.find scans replace a
+    backtracking regex pass over the multi-KB retrieval payload.
+    """
+    anchor = text.find(f'"{key}"', start)
+    if anchor == -1:
+        return None, -1
+    colon = text.find(':', anchor)
+    opening = text.find('"', colon + 1)
+    closing = text.find('"', opening + 1)
+    if colon == -1 or opening == -1 or closing == -1:
+        return None, -1
+    return text[opening + 1:closing], closing + 1
+
+
 def extract_s3_info(retrieved_text):
     """
     Extract just the S3 bucket and key information from the retrieved text
     """
     try:
-        # Look for metadata section containing s3_bucket and s3_key
-        metadata_pattern = re.compile(r'"metadata":\s*{[^}]*"s3_bucket":\s*"([^"]+)",[^}]*"s3_key":\s*"([^"]+)"')
-        
-        # Find the match in the text
-        match = metadata_pattern.search(retrieved_text)
-        
-        if match:
-            s3_bucket = match.group(1)
-            s3_key = match.group(2)
-            
+        s3_bucket = s3_key = None
+        if len(retrieved_text) < 256:
+            # Tiny payloads: a couple of str.find scans beat regex setup
+            s3_bucket, pos = _find_json_str_value(retrieved_text, "s3_bucket")
+            if s3_bucket is not None:
+                s3_key, _ = _find_json_str_value(retrieved_text, "s3_key", pos)
+        else:
+            # One DFA pass extracts the s3_bucket / s3_key pair from the
+            # metadata section of a large retrieval blob
+            match = _S3_META_RE.search(retrieved_text)
+            if match:
+                s3_bucket, s3_key = match.group(1), match.group(2)
+
+        if s3_bucket is not None and s3_key is not None:
             print("\nExtracted S3 Info:")
             print(f"Bucket: {s3_bucket}")
             print(f"Key: {s3_key}")
-            
+
             return {
                 'bucket': s3_bucket,
                 'key': s3_key
             }
-            
+
         else:
             print("Could not find S3 bucket and key information in the text")
             return None
-            
+
     except Exception as e:
         print(f"Error extracting S3 info: {str(e)}")
         return None
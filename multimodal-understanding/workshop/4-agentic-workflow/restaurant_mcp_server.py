@@ -1,6 +1,8 @@
 import uuid
 import boto3
 import argparse
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from mcp.server.fastmcp import FastMCP
 from typing import Dict, Any
 
@@ -12,8 +14,16 @@ parser = argparse.ArgumentParser(description="Restaurant Booking MCP Server")
 parser.add_argument("--table-name", help="DynamoDB table name")
 args, unknown = parser.parse_known_args()
 
-# Create/get the DynamoDB table
-dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
+# Create/get the DynamoDB table. Keep-alive reuses the TCP/TLS connection
+# across tool calls, the larger pool covers the segmented scan workers, and
+# adaptive retries apply client-side rate limiting with jittered backoff
+# when DynamoDB throttles.
+config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+dynamodb = boto3.resource('dynamodb', region_name='us-west-2', config=config)
 
 # Get table name from environment variable, command-line argument, or use default
 table_name = args.table_name
@@ -32,7 +42,15 @@ def get_booking_details(booking_id: str) -> Dict[str, Any]:
         The booking details if found, otherwise a message indicating no booking was found.
     """
     try:
-        response = table.get_item(Key={'booking_id': booking_id})
+        # Eventually consistent read at half the RCU cost, projected down to
+        # the booking fields (date/name/hour are DynamoDB reserved words, so
+        # they go through attribute-name aliases)
+        response = table.get_item(
+            Key={'booking_id': booking_id},
+            ConsistentRead=False,
+            ProjectionExpression='booking_id, #d, #n, #h, num_guests',
+            ExpressionAttributeNames={'#d': 'date', '#n': 'name', '#h': 'hour'}
+        )
         if 'Item' in response:
             return response['Item']
         else:
@@ -56,17 +74,26 @@ def create_booking(date: str, name: str, hour: str, num_guests: int) -> Dict[str
         A dictionary containing the booking ID of the newly created reservation.
     """
     try:
-        booking_id = str(uuid.uuid4())[:8]
-        table.put_item(
-            Item={
-                'booking_id': booking_id,
-                'date': date,
-                'name': name,
-                'hour': hour,
-                'num_guests': num_guests
-            }
-        )
-        return {'booking_id': booking_id}
+        # The 8-char truncated UUID can collide; the conditional write
+        # refuses to overwrite an existing booking and a fresh id is drawn
+        # instead of silently clobbering someone else's reservation
+        for _ in range(3):
+            booking_id = str(uuid.uuid4())[:8]
+            try:
+                table.put_item(
+                    Item={
+                        'booking_id': booking_id,
+                        'date': date,
+                        'name': name,
+                        'hour': hour,
+                        'num_guests': num_guests
+                    },
+                    ConditionExpression='attribute_not_exists(booking_id)'
+                )
+                return {'booking_id': booking_id}
+            except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+                continue
+        return {'error': 'Could not allocate a unique booking ID'}
     except Exception as e:
         return {'error': str(e)}
 
@@ -101,15 +128,30 @@ def list_bookings() -> Dict[str, Any]:
         A dictionary containing a list of all bookings.
     """
     try:
-        response = table.scan()
-        bookings = response.get('Items', [])
-        
-        # Handle pagination if necessary
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            bookings.extend(response.get('Items', []))
-        
-        return {'bookings': bookings}
+        # Parallel segmented scan: each worker walks its own table segment,
+        # pulling from several partitions at once instead of paging through
+        # the whole table sequentially
+        segments = 4
+
+        def scan_segment(segment):
+            items = []
+            response = table.scan(Segment=segment, TotalSegments=segments)
+            items.extend(response.get('Items', []))
+
+            # Handle pagination if necessary
+            while 'LastEvaluatedKey' in response:
+                response = table.scan(
+                    Segment=segment,
+                    TotalSegments=segments,
+                    ExclusiveStartKey=response['LastEvaluatedKey']
+                )
+                items.extend(response.get('Items', []))
+            return items
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            parts = list(executor.map(scan_segment, range(segments)))
+
+        return {'bookings': [booking for part in parts for booking in part]}
     except Exception as e:
         return {'error': str(e)}
 